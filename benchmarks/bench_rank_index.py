@@ -0,0 +1,58 @@
+# benchmarks/bench_rank_index.py
+#
+# Benchmarks the in-memory XPRankIndex used by /rank for large guilds against a
+# linear scan, with 1M members in one guild.
+# Run from the repo root: python -m benchmarks.bench_rank_index
+
+import random
+import time
+
+from cogs.leaderboard import XPRankIndex
+
+MEMBERS = 1_000_000
+QUERIES = 100_000
+UPDATES = 100_000
+
+
+def timed(label: str, func, count: int = 1):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    per_op = f" ({elapsed / count * 1e6:.2f} µs/op)" if count > 1 else ""
+    print(f"{label}: {elapsed:.3f}s{per_op}")
+    return result
+
+
+def main():
+    random.seed(42)
+    # Skewed XP like a real guild: most members have little, a few have a lot
+    xp_values = [int(random.paretovariate(1.2) * 50) for _ in range(MEMBERS)]
+    queries = [random.choice(xp_values) for _ in range(QUERIES)]
+
+    index = timed(f"build index ({MEMBERS:,} members)", lambda: XPRankIndex(xp_values))
+    print(f"  buckets in use: {len(index.buckets):,}, tree size: {index.tree.size:,}")
+
+    timed(f"{QUERIES:,} rank queries", lambda: [index.rank(xp) for xp in queries], QUERIES)
+
+    def apply_updates():
+        for _ in range(UPDATES):
+            i = random.randrange(MEMBERS)
+            old = xp_values[i]
+            xp_values[i] = old + 10
+            index.update(old, xp_values[i])
+    timed(f"{UPDATES:,} XP updates", apply_updates, UPDATES)
+
+    scan_queries = queries[:20]
+    timed(
+        f"{len(scan_queries)} rank queries by linear scan",
+        lambda: [sum(1 for v in xp_values if v > xp) + 1 for xp in scan_queries],
+        len(scan_queries)
+    )
+
+    # Sanity check against the scan
+    for xp in scan_queries:
+        assert index.rank(xp) == sum(1 for v in xp_values if v > xp) + 1
+
+
+if __name__ == "__main__":
+    main()
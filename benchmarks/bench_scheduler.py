@@ -0,0 +1,118 @@
+# benchmarks/bench_scheduler.py
+#
+# Benchmarks the ScheduleWindow used by the Scheduler cog with 1M pending actions: draining
+# them in due order through batched refills while new actions keep arriving, compared with
+# the memory cost of one sleeping task per action (the /remindme approach).
+# The (dueAt, _id) index is stood in for by sorted lists searched with bisect.
+# Run from the repo root: python -m benchmarks.bench_scheduler
+
+import asyncio
+import bisect
+import heapq
+import itertools
+import random
+import time
+import tracemalloc
+
+from cogs.scheduler import ScheduleWindow
+
+ACTIONS = 1_000_000
+INSERTS = 100_000
+WINDOW = 500
+SLEEPING_TASKS = 100_000
+
+
+class IndexedStore:
+    """Sorted (due_at, action_id) keys, with late inserts kept in a second sorted list."""
+
+    def __init__(self, keys: list):
+        self.keys = sorted(keys)
+        self.inserted = []
+        self.fetches = 0
+
+    def insert(self, key: tuple):
+        bisect.insort(self.inserted, key)
+
+    def fetch_after(self, key, limit: int) -> list:
+        self.fetches += 1
+        parts = []
+        for keys in (self.keys, self.inserted):
+            start = bisect.bisect_right(keys, key) if key else 0
+            parts.append(keys[start:start + limit])
+        return [(due_at, action_id, None) for due_at, action_id in itertools.islice(heapq.merge(*parts), limit)]
+
+
+def timed(label: str, func, count: int = 1):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    per_op = f" ({elapsed / count * 1e6:.2f} µs/op)" if count > 1 else ""
+    print(f"{label}: {elapsed:.3f}s{per_op}")
+    return result
+
+
+def main():
+    random.seed(42)
+    horizon = 30 * 24 * 3600  # actions spread over 30 days, in seconds
+    store = timed(
+        f"build store ({ACTIONS:,} actions)",
+        lambda: IndexedStore([(random.uniform(0, horizon), i) for i in range(ACTIONS)])
+    )
+    # New actions arriving while the queue drains, some due soon and some far out
+    arrivals = sorted((random.uniform(0, horizon), random.uniform(0, horizon)) for _ in range(INSERTS))
+    next_id = itertools.count(ACTIONS)
+    window = ScheduleWindow(WINDOW)
+
+    def drain():
+        executed = []
+        pending_arrivals = iter(arrivals)
+        arrival = next(pending_arrivals, None)
+        while True:
+            limit = window.refill_limit()
+            if limit:
+                window.extend(store.fetch_after(window.loaded_until, limit), limit)
+            due_at = window.next_due()
+            if due_at is None:
+                return executed
+            # Schedule everything that "arrived" before the clock reaches the next due time
+            while arrival and arrival[0] <= due_at:
+                key = (max(arrival[1], arrival[0]), next(next_id))
+                store.insert(key)
+                window.add(*key, None)
+                arrival = next(pending_arrivals, None)
+            executed.extend(due_at for _ in window.pop_due(due_at))
+
+    total = ACTIONS + INSERTS
+    executed = timed(f"drain {total:,} actions with {INSERTS:,} inserts interleaved", drain, total)
+    print(f"  store fetches: {store.fetches:,} (~{total / store.fetches:.0f} actions per fetch)")
+    # Every action ran exactly once, in due order
+    assert len(executed) == total and all(a <= b for a, b in zip(executed, executed[1:]))
+
+    # Memory: the bounded window vs one sleeping task per pending action
+    window = ScheduleWindow(WINDOW)
+    tracemalloc.start()
+    window.extend(store.fetch_after(None, WINDOW), WINDOW)
+    window_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"window of {WINDOW} actions: {window_bytes / 1024:.0f} KiB (constant in the number of pending actions)")
+
+    async def sleeping_tasks():
+        tracemalloc.start()
+        tasks = [asyncio.create_task(asyncio.sleep(horizon)) for _ in range(SLEEPING_TASKS)]
+        await asyncio.sleep(0)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return used
+
+    task_bytes = asyncio.run(sleeping_tasks())
+    print(
+        f"{SLEEPING_TASKS:,} sleeping tasks: {task_bytes / 1024 ** 2:.0f} MiB "
+        f"(~{task_bytes / SLEEPING_TASKS * ACTIONS / 1024 ** 2:,.0f} MiB for {ACTIONS:,})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 class AFKAndLockdown(commands.Cog):
@@ -18,6 +19,11 @@ class AFKAndLockdown(commands.Cog):
         # If you want to store AFK statuses in a DB, do so. Otherwise, use a dict in memory:
         self.afk_users = {}  # {user_id: {"reason": str, "guild_id": int}}
 
+    async def cog_load(self):
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler:
+            scheduler.register("unlock", self.scheduled_unlock)
+
     # ======================================================
     # =============== 1) AFK / Busy Feature ================
     # ======================================================
@@ -92,15 +98,17 @@ class AFKAndLockdown(commands.Cog):
         interaction: discord.Interaction,
         enabled: bool,
         channel: Optional[discord.TextChannel] = None,
-        exempt_role: Optional[discord.Role] = None
+        exempt_role: Optional[discord.Role] = None,
+        duration: Optional[app_commands.Range[int, 1, 10080]] = None
     ):
         """
-        /lockdown <enabled: bool> [channel] [exempt_role]
+        /lockdown <enabled: bool> [channel] [exempt_role] [duration]
 
         If enabled=True, denies @everyone from sending messages.
         But if you provide an exempt_role, that role is allowed to speak.
         If enabled=False, re-allows @everyone to speak.
         Defaults to the current channel if not specified.
+        With a duration (minutes), the channel is unlocked again automatically.
         """
         target_channel = channel or interaction.channel
         if not isinstance(target_channel, discord.TextChannel):
@@ -152,13 +160,40 @@ class AFKAndLockdown(commands.Cog):
                 )
                 return
 
+        # Schedule (or cancel) the automatic unlock
+        scheduler = self.bot.get_cog("Scheduler")
+        until_msg = ""
+        if scheduler:
+            scheduler.cancel("unlock", interaction.guild.id, channelId=str(target_channel.id))
+            if enabled and duration:
+                unlock_at = datetime.utcnow() + timedelta(minutes=duration)
+                await scheduler.schedule(
+                    "unlock", unlock_at, interaction.guild.id,
+                    channelId=str(target_channel.id),
+                    exemptRoleId=str(exempt_role.id) if exempt_role else None
+                )
+                until_msg = f"\nUnlocks {discord.utils.format_dt(unlock_at.replace(tzinfo=timezone.utc), 'R')}."
+
         # Confirmation message
         exempt_msg = f"\nExempt role: {exempt_role.mention}" if exempt_role and enabled else ""
         await interaction.response.send_message(
-            f"Channel {target_channel.mention} has been **{action_text}**." + exempt_msg,
+            f"Channel {target_channel.mention} has been **{action_text}**." + exempt_msg + until_msg,
             ephemeral=True
         )
 
+    async def scheduled_unlock(self, guild: discord.Guild, payload: dict):
+        """Undo a timed /lockdown: reset the @everyone and exempt role send overwrites."""
+        channel = guild.get_channel(int(payload["channelId"]))
+        if not isinstance(channel, discord.TextChannel):
+            return
+        targets = [guild.default_role]
+        if payload.get("exemptRoleId") and (exempt_role := guild.get_role(int(payload["exemptRoleId"]))):
+            targets.append(exempt_role)
+        for target in targets:
+            overwrite = channel.overwrites_for(target)
+            overwrite.send_messages = None
+            await channel.set_permissions(target, overwrite=overwrite, reason="Timed lockdown expired")
+
     @app_commands.command(
         name="slowmode",
         description="Set slowmode delay (in seconds) for a channel."
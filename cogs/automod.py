@@ -7,6 +7,9 @@ import re
 from collections import defaultdict
 import os
 
+from cogs.log_delivery import deliver_log
+
+LOG_SAMPLE_RATE = 0.25  # fraction of automod action log lines kept (the log channel gets all of them)
 
 class AutoMod(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -64,6 +67,10 @@ class AutoMod(commands.Cog):
         await self.bot.process_commands(message)
 
     async def log_moderation_action(self, guild: discord.Guild, action: str, details: str):
+        self.logger.info(
+            "AutoMod action: %s", action,
+            extra={"cog": "AutoMod", "guild_id": guild.id, "event": "automod", "sample_rate": LOG_SAMPLE_RATE}
+        )
         guild_data = self.guild_settings.find_one({"guildId": str(guild.id)})
         if guild_data and "logChannel" in guild_data:
             log_channel_id = int(guild_data["logChannel"])
@@ -72,7 +79,7 @@ class AutoMod(commands.Cog):
                 embed = discord.Embed(title="Auto-Moderation Action", color=discord.Color.orange())
                 embed.add_field(name="Action", value=action, inline=False)
                 embed.add_field(name="Details", value=details, inline=False)
-                await log_channel.send(embed=embed)
+                await deliver_log(self.bot, log_channel, embed=embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AutoMod(bot))
@@ -0,0 +1,171 @@
+# cogs/error_sink.py
+
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+import hashlib
+import os
+import re
+import sys
+import traceback
+
+
+def record_error(bot: commands.Bot, error: BaseException, source: str):
+    """Hand an exception to the ErrorSink cog, if it is loaded."""
+    sink = bot.get_cog("ErrorSink")
+    if sink:
+        sink.record(error, source)
+
+
+def loop_error_handler(name: str):
+    """
+    Build a `@loop.error` handler for a cog's task loop. It runs when an exception escapes the
+    loop body (which stops the loop) and hands it to the sink as `task:<name>`.
+    """
+    async def on_loop_error(cog: commands.Cog, error: BaseException):
+        cog.logger.error(
+            "Task loop %s stopped: %s", name, error,
+            extra={"cog": cog.qualified_name, "event": name}
+        )
+        record_error(cog.bot, error, f"task:{name}")
+    return on_loop_error
+
+
+def fingerprint_error(error: BaseException) -> str:
+    """
+    Fingerprint an exception by its type and a normalized traceback: only the file names and
+    function names of each frame are kept, so line shifts and varying messages/IDs don't
+    split one bug into many entries.
+    """
+    frames = traceback.extract_tb(error.__traceback__)
+    normalized = "|".join(f"{os.path.basename(f.filename)}:{f.name}" for f in frames)
+    key = f"{type(error).__module__}.{type(error).__qualname__}|{normalized}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class ErrorSink(commands.Cog):
+    """
+    Global error sink. App command errors, listener exceptions and task-loop exceptions are
+    fingerprinted and counted in memory, then bulk upserted into the errorLogs collection
+    once a minute (one document per fingerprint rather than one per occurrence).
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = bot.logger
+        self.error_logs = bot.error_logs
+        self.pending = {}  # {fingerprint: aggregate dict}
+        self._original_tree_error = None
+        self._original_on_error = None
+
+    async def cog_load(self):
+        self.error_logs.create_index("fingerprint", unique=True)
+        self.error_logs.create_index([("count", -1)])
+
+        self._original_tree_error = self.bot.tree.on_error
+        self.bot.tree.on_error = self.on_app_command_error
+        self._original_on_error = self.bot.on_error
+        self.bot.on_error = self.on_event_error
+
+        self.flush_errors.start()
+
+    async def cog_unload(self):
+        self.bot.tree.on_error = self._original_tree_error
+        self.bot.on_error = self._original_on_error
+        self.flush_errors.cancel()
+        self.flush()
+
+    # ================================================================
+    #                   Hooks
+    # ================================================================
+    async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        # Permission/cooldown failures are user errors, not bugs
+        if not isinstance(error, app_commands.CheckFailure):
+            original = getattr(error, "original", error)
+            command = interaction.command.qualified_name if interaction.command else "unknown"
+            self.record(original, f"app_command:{command}")
+        await self._original_tree_error(interaction, error)
+
+    async def on_event_error(self, event_method: str, *args, **kwargs):
+        error = sys.exc_info()[1]
+        if error is not None:
+            self.record(error, f"event:{event_method}")
+        await self._original_on_error(event_method, *args, **kwargs)
+
+    # ================================================================
+    #                   Aggregation
+    # ================================================================
+    def record(self, error: BaseException, source: str):
+        fingerprint = fingerprint_error(error)
+        now = datetime.now(timezone.utc)
+        entry = self.pending.get(fingerprint)
+        if entry is None:
+            entry = self.pending[fingerprint] = {
+                "type": type(error).__qualname__,
+                "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__))[-4000:],
+                "count": 0,
+                "firstSeen": now,
+            }
+        entry["count"] += 1
+        entry["lastSeen"] = now
+        entry["source"] = source
+        # Keep the latest message, with long digit runs (IDs) masked
+        entry["message"] = re.sub(r"\d{5,}", "<id>", str(error))[:500]
+
+    @tasks.loop(minutes=1)
+    async def flush_errors(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error("Failed to flush error aggregates: %s", e, extra={"cog": "ErrorSink", "event": "flush"})
+
+    flush_errors.error(loop_error_handler("flush_errors"))
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        operations = [
+            UpdateOne(
+                {"fingerprint": fingerprint},
+                {
+                    "$inc": {"count": entry["count"]},
+                    "$set": {
+                        "lastSeen": entry["lastSeen"],
+                        "lastSource": entry["source"],
+                        "lastMessage": entry["message"],
+                    },
+                    "$setOnInsert": {
+                        "type": entry["type"],
+                        "traceback": entry["traceback"],
+                        "firstSeen": entry["firstSeen"],
+                    },
+                },
+                upsert=True
+            )
+            for fingerprint, entry in pending.items()
+        ]
+        try:
+            self.error_logs.bulk_write(operations, ordered=False)
+        except Exception:
+            # Put the counts back so they go out with the next flush
+            for fingerprint, entry in pending.items():
+                if fingerprint in self.pending:
+                    self.pending[fingerprint]["count"] += entry["count"]
+                else:
+                    self.pending[fingerprint] = entry
+            raise
+
+    def top_errors(self, limit: int = 10) -> list:
+        """Return the most frequent fingerprints, including counts not flushed yet."""
+        self.flush()
+        return list(self.error_logs.find(
+            {},
+            {"fingerprint": 1, "type": 1, "count": 1, "lastSeen": 1, "lastSource": 1, "lastMessage": 1}
+        ).sort("count", -1).limit(limit))
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ErrorSink(bot))
@@ -1,62 +1,563 @@
 # cogs/leaderboard.py
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+from pymongo import ASCENDING, DESCENDING
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import bisect
+import time
+
+from cogs.error_sink import record_error, loop_error_handler
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # {key: (expires_at, value)}
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        if item[0] < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key, value, ttl: float = None):
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class TopKCache:
+    """
+    The top-K members of one guild by XP, kept sorted (highest first) in memory.
+
+    Invariant: `entries` is always the exact top len(entries) of the guild, i.e. every
+    member not in the cache has at most the XP of the last entry. If the guild had fewer
+    than K level docs when loaded, the cache holds the whole guild (`complete`).
+    Ties are broken by the stored userId string, matching the DB sort used for paging.
+    """
+
+    def __init__(self, size: int, docs: list):
+        self.size = size
+        self.entries = []  # sorted [(-xp, user_id_str)]
+        self.levels = {}  # {user_id_str: (xp, level)}
+        for doc in docs:
+            user_id = doc["userId"]
+            xp = doc.get("xp", 0)
+            self.entries.append((-xp, user_id))
+            self.levels[user_id] = (xp, doc.get("level", 1))
+        self.entries.sort()
+        self.complete = len(self.entries) < size
+        self.last_used = time.monotonic()
+
+    def update(self, user_id: int, xp: int, level: int):
+        user_id = str(user_id)
+        old = self.levels.pop(user_id, None)
+        if old is not None:
+            self.entries.remove((-old[0], user_id))
+
+        key = (-xp, user_id)
+        if not self.complete and self.entries and key > self.entries[-1]:
+            # Ranks below everything we hold: someone outside the cache may beat it,
+            # so leave it out (the cache shrinks until the next reload).
+            return
+
+        bisect.insort(self.entries, key)
+        self.levels[user_id] = (xp, level)
+        if len(self.entries) > self.size:
+            _, dropped = self.entries.pop()
+            del self.levels[dropped]
+            self.complete = False
+
+    def top(self, count: int) -> list:
+        """Return up to `count` (user_id, xp, level) tuples, best first."""
+        self.last_used = time.monotonic()
+        return [(int(user_id), -neg_xp, self.levels[user_id][1]) for neg_xp, user_id in self.entries[:count]]
+
+    def covers(self, count: int) -> bool:
+        return self.complete or len(self.entries) >= count
+
+
+class FenwickTree:
+    """Binary indexed tree of counts: O(log n) point updates and prefix sums."""
+
+    def __init__(self, counts: list):
+        self.size = len(counts)
+        self.tree = [0] + list(counts)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index: int, delta: int):
+        i = index + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of counts[0..index]."""
+        total = 0
+        i = min(index + 1, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+
+class XPRankIndex:
+    """
+    Order-statistic index over one guild's XP values. Members are counted per XP bucket in
+    a Fenwick tree, and each bucket keeps a {xp: count} map so ranks stay exact:
+    rank = members in higher buckets + members higher in the same bucket + 1.
+
+    Buckets are BUCKET_WIDTH wide up to LINEAR_LIMIT and log-scaled above it (16 per power
+    of two), so the tree has a fixed size no matter how high one member's XP goes.
+    """
+
+    BUCKET_WIDTH = 100
+    LINEAR_LIMIT = 2 ** 19
+    LINEAR_BUCKETS = -(-LINEAR_LIMIT // BUCKET_WIDTH)
+    LOG_SUBBUCKETS = 16
+    BUCKETS = LINEAR_BUCKETS + (64 - LINEAR_LIMIT.bit_length() + 1) * LOG_SUBBUCKETS
+
+    def __init__(self, xp_values):
+        self.buckets = {}  # {bucket: {xp: count}}
+        self.total = 0
+        for xp in xp_values:
+            xp = max(xp, 0)
+            counts = self.buckets.setdefault(self.bucket_of(xp), {})
+            counts[xp] = counts.get(xp, 0) + 1
+            self.total += 1
+        counts = [0] * self.BUCKETS
+        for bucket, values in self.buckets.items():
+            counts[bucket] = sum(values.values())
+        self.tree = FenwickTree(counts)
+        self.built_at = self.last_used = time.monotonic()
+
+    @classmethod
+    def bucket_of(cls, xp: int) -> int:
+        if xp < cls.LINEAR_LIMIT:
+            return xp // cls.BUCKET_WIDTH
+        exponent = min(xp.bit_length(), 64) - 1
+        mantissa = (xp >> (exponent - 4)) & (cls.LOG_SUBBUCKETS - 1)
+        return cls.LINEAR_BUCKETS + (exponent - cls.LINEAR_LIMIT.bit_length() + 1) * cls.LOG_SUBBUCKETS + mantissa
+
+    def _add(self, xp: int, delta: int):
+        xp = max(xp, 0)
+        bucket = self.bucket_of(xp)
+        counts = self.buckets.setdefault(bucket, {})
+        counts[xp] = counts.get(xp, 0) + delta
+        if counts[xp] <= 0:
+            del counts[xp]
+            if not counts:
+                del self.buckets[bucket]
+        self.tree.add(bucket, delta)
+        self.total += delta
+
+    def update(self, old_xp, new_xp: int):
+        """Move a member from `old_xp` to `new_xp` (old_xp None for a new member)."""
+        if old_xp is not None:
+            self._add(old_xp, -1)
+        self._add(new_xp, 1)
+
+    def rank(self, xp: int) -> int:
+        """1-based position of a member with `xp` (ties share the best position)."""
+        self.last_used = time.monotonic()
+        xp = max(xp, 0)
+        bucket = self.bucket_of(xp)
+        above = self.total - self.tree.prefix_sum(bucket)
+        above += sum(count for value, count in self.buckets.get(bucket, {}).items() if value > xp)
+        return above + 1
+
+
+class LeaderboardView(discord.ui.View):
+    """
+    Paginated leaderboard. Pages are fetched with (xp, userId) keyset cursors, and the next
+    page (including its usernames) is prefetched while the current one is being read.
+    """
+
+    PAGE_SIZE = 10
+
+    def __init__(self, cog: "Leaderboard", guild: discord.Guild, author_id: int, entries: list):
+        super().__init__(timeout=120)
+        self.cog = cog
+        self.guild = guild
+        self.author_id = author_id
+        self.entries = entries  # [(user_id, xp, level)] for the current page
+        self.page = 0
+        self.message = None
+        self._next_task = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run /leaderboard yourself to page through it.", ephemeral=True)
+            return False
+        return True
+
+    async def render(self, names: dict = None) -> discord.Embed:
+        if names is None:
+            names = await self.cog.resolve_names(self.guild, [user_id for user_id, _, _ in self.entries])
+
+        embed = discord.Embed(
+            title=f"Leaderboard for {self.guild.name}",
+            description=f"Members by XP — page {self.page + 1}",
+            color=discord.Color.gold()
+        )
+        rank = self.page * self.PAGE_SIZE + 1
+        for user_id, xp, level in self.entries:
+            embed.add_field(
+                name=f"#{rank} — {names[user_id]}",
+                value=f"Level {level} ({xp} XP)",
+                inline=False
+            )
+            rank += 1
+        if not self.entries:
+            embed.description = "No one has earned XP yet."
+
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = len(self.entries) < self.PAGE_SIZE
+        return embed
+
+    def _cursor(self, entry: tuple) -> tuple:
+        user_id, xp, _ = entry
+        return xp, str(user_id)
+
+    async def _load_page(self, cursor: tuple, forward: bool) -> tuple:
+        entries = self.cog.fetch_page(self.guild.id, cursor, forward, self.PAGE_SIZE)
+        names = await self.cog.resolve_names(self.guild, [user_id for user_id, _, _ in entries])
+        return entries, names
+
+    def prefetch_next(self):
+        if self.is_finished() or len(self.entries) < self.PAGE_SIZE:
+            self._next_task = None
+            return
+        self._next_task = asyncio.create_task(self._load_page(self._cursor(self.entries[-1]), True))
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page == 1:
+            entries, names = self.cog.get_top(self.guild.id, self.PAGE_SIZE), None
+        else:
+            entries, names = await self._load_page(self._cursor(self.entries[0]), False)
+        if self._next_task:
+            self._next_task.cancel()
+        self.page -= 1
+        self.entries = entries
+        await interaction.response.edit_message(embed=await self.render(names), view=self)
+        self.prefetch_next()
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        task, self._next_task = self._next_task, None
+        if task:
+            entries, names = await task
+        else:
+            entries, names = await self._load_page(self._cursor(self.entries[-1]), True)
+        if not entries:
+            button.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        self.page += 1
+        self.entries = entries
+        await interaction.response.edit_message(embed=await self.render(names), view=self)
+        self.prefetch_next()
+
+    async def on_timeout(self):
+        if self._next_task:
+            self._next_task.cancel()
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+        # Release page data and references held by the view
+        self.entries = []
+        self.message = None
+        self._next_task = None
+
 
 class Leaderboard(commands.Cog):
     """
     Cog that provides a /leaderboard command to show top XP earners in the guild.
+    The top members of each guild are cached in memory and kept current from XP updates.
     """
 
+    CACHE_SIZE = 100
+    CACHE_IDLE_SECONDS = 3600
+    HOT_GUILD_MEMBERS = 25000  # guilds this large get an in-memory XPRankIndex
+    RANK_INDEX_REBUILD_SECONDS = 3600
+    NAME_TTL = 3600
+    MISSING_USER_TTL = 6 * 3600
+    FETCH_CONCURRENCY = 4
+    PERIOD_CACHE_TTL = 300
+    PERIOD_DAYS = {"week": 7, "month": 30}
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.levels = bot.levels  # Reference your "levels" MongoDB collection
+        self.xp_daily = bot.xp_daily  # Per-day XP buckets written by Premium
         self.logger = bot.logger
+        self.top_caches = {}  # {guild_id: TopKCache}
+        self.rank_indexes = {}  # {guild_id: XPRankIndex}
+        self.rank_index_builds = {}  # {guild_id: asyncio.Task} for indexes still being built
+        self.period_cache = TTLCache(maxsize=1000, ttl=self.PERIOD_CACHE_TTL)  # {(guild_id, days): entries}
+        self.name_cache = TTLCache(maxsize=10000, ttl=self.NAME_TTL)  # {user_id: name or None}
+        self.fetch_semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+
+    async def cog_load(self):
+        # Serves both the keyset-paged leaderboard and the covered rank counts
+        self.levels.create_index([("guildId", ASCENDING), ("xp", DESCENDING), ("userId", ASCENDING)])
+        self.reconcile_top_caches.start()
+
+    async def cog_unload(self):
+        self.reconcile_top_caches.cancel()
+        for task in self.rank_index_builds.values():
+            task.cancel()
+
+    def _load_top_cache(self, guild_id: int) -> TopKCache:
+        docs = self.levels.find(
+            {"guildId": str(guild_id)},
+            {"_id": 0, "userId": 1, "xp": 1, "level": 1}
+        ).sort([("xp", DESCENDING), ("userId", ASCENDING)]).limit(self.CACHE_SIZE)
+        cache = TopKCache(self.CACHE_SIZE, list(docs))
+        self.top_caches[guild_id] = cache
+        return cache
+
+    def get_top(self, guild_id: int, count: int) -> list:
+        """Top `count` members as (user_id, xp, level), loading the guild's cache lazily."""
+        cache = self.top_caches.get(guild_id)
+        if cache is None or not cache.covers(count):
+            cache = self._load_top_cache(guild_id)
+        return cache.top(count)
+
+    def fetch_page(self, guild_id: int, cursor: tuple, forward: bool, count: int) -> list:
+        """
+        Keyset page of (user_id, xp, level) ordered by xp desc, userId asc, starting right
+        after (forward) or right before (backward) the (xp, userId) cursor.
+        """
+        xp, user_id = cursor
+        if forward:
+            keyset = [{"xp": {"$lt": xp}}, {"xp": xp, "userId": {"$gt": user_id}}]
+            sort = [("xp", DESCENDING), ("userId", ASCENDING)]
+        else:
+            keyset = [{"xp": {"$gt": xp}}, {"xp": xp, "userId": {"$lt": user_id}}]
+            sort = [("xp", ASCENDING), ("userId", DESCENDING)]
+
+        docs = list(self.levels.find(
+            {"guildId": str(guild_id), "$or": keyset},
+            {"_id": 0, "userId": 1, "xp": 1, "level": 1}
+        ).sort(sort).limit(count))
+        if not forward:
+            docs.reverse()
+        return [(int(doc["userId"]), doc.get("xp", 0), doc.get("level", 1)) for doc in docs]
+
+    def _aggregate_period_top(self, guild_id: int, days: int, count: int) -> list:
+        # Today's bucket plus the previous days-1, i.e. at most `days` buckets per member
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        since = today - timedelta(days=days - 1)
+        pipeline = [
+            {"$match": {"guildId": str(guild_id), "day": {"$gte": since}}},
+            {"$group": {"_id": "$userId", "xp": {"$sum": "$xp"}}},
+            {"$sort": {"xp": -1, "_id": 1}},
+            {"$limit": count},
+        ]
+        return [(int(doc["_id"]), doc["xp"]) for doc in self.xp_daily.aggregate(pipeline)]
+
+    async def get_period_top(self, guild_id: int, days: int, count: int = 10) -> list:
+        """Top `count` (user_id, xp) earned over the last `days` days, cached for a few minutes."""
+        key = (guild_id, days)
+        entries = self.period_cache.get(key)
+        if entries is None:
+            entries = await asyncio.to_thread(self._aggregate_period_top, guild_id, days, count)
+            self.period_cache.set(key, entries)
+        return entries
+
+    def _build_rank_index(self, guild_id: int) -> XPRankIndex:
+        cursor = self.levels.find({"guildId": str(guild_id)}, {"_id": 0, "xp": 1}, batch_size=10000)
+        return XPRankIndex(doc.get("xp", 0) for doc in cursor)
+
+    async def _build_rank_index_in_background(self, guild_id: int):
+        task = asyncio.current_task()
+        try:
+            # Updates made during the build may be missed (see reconcile_top_caches)
+            index = await asyncio.to_thread(self._build_rank_index, guild_id)
+            # Skip the result if the guild's levels were recalculated while we were building
+            if self.rank_index_builds.get(guild_id) is task:
+                self.rank_indexes[guild_id] = index
+        except Exception as e:
+            self.logger.error(
+                "Failed to build rank index: %s", e,
+                extra={"cog": "Leaderboard", "guild_id": guild_id, "event": "rank_index"}
+            )
+        finally:
+            if self.rank_index_builds.get(guild_id) is task:
+                del self.rank_index_builds[guild_id]
+
+    async def rank_position(self, guild: discord.Guild, xp: int) -> tuple:
+        """
+        Return (position, total) for a member with `xp`. Large guilds use an in-memory
+        order-statistic index once it's built; others (and large guilds until then) use
+        counts covered by the (guildId, xp) index.
+        """
+        index = self.rank_indexes.get(guild.id)
+        if index is not None:
+            return index.rank(xp), index.total
+        if (guild.member_count or 0) >= self.HOT_GUILD_MEMBERS and guild.id not in self.rank_index_builds:
+            # Building streams every level doc, so do it in the background and count meanwhile
+            self.rank_index_builds[guild.id] = asyncio.create_task(self._build_rank_index_in_background(guild.id))
+
+        guild_id_str = str(guild.id)
+        above = self.levels.count_documents({"guildId": guild_id_str, "xp": {"$gt": xp}})
+        total = self.levels.count_documents({"guildId": guild_id_str})
+        return above + 1, total
+
+    async def resolve_names(self, guild: discord.Guild, user_ids: list) -> dict:
+        """
+        Map user IDs to display names. Tries the member/user cache and the name cache first,
+        then fetches the remaining users concurrently (bounded by a semaphore).
+        Deleted/unknown users are negatively cached and shown by ID.
+        """
+        names = {}
+        misses = []
+        for user_id in user_ids:
+            user = guild.get_member(user_id) or self.bot.get_user(user_id)
+            if user:
+                names[user_id] = user.name
+                continue
+            cached = self.name_cache.get(user_id, default=...)
+            if cached is ...:
+                misses.append(user_id)
+            else:
+                names[user_id] = cached
+
+        async def fetch(user_id: int):
+            async with self.fetch_semaphore:
+                try:
+                    user = await self.bot.fetch_user(user_id)
+                except discord.NotFound:
+                    self.name_cache.set(user_id, None, ttl=self.MISSING_USER_TTL)
+                    return user_id, None
+                except discord.HTTPException:
+                    return user_id, None  # transient: don't cache
+            self.name_cache.set(user_id, user.name)
+            return user_id, user.name
+
+        for user_id, name in await asyncio.gather(*(fetch(user_id) for user_id in misses)):
+            names[user_id] = name
+
+        return {user_id: names.get(user_id) or f"User ID {user_id}" for user_id in user_ids}
+
+    @commands.Cog.listener()
+    async def on_xp_update(self, guild_id: int, user_id: int, old_xp, xp: int, level: int):
+        cache = self.top_caches.get(guild_id)
+        if cache is not None:
+            cache.update(user_id, xp, level)
+        index = self.rank_indexes.get(guild_id)
+        if index is not None:
+            index.update(old_xp, xp)
+
+    @commands.Cog.listener()
+    async def on_levels_recalculated(self, guild_id: int):
+        # Levels/XP changed in bulk; rebuild lazily on the next read
+        self.top_caches.pop(guild_id, None)
+        self.rank_indexes.pop(guild_id, None)
+        self.rank_index_builds.pop(guild_id, None)
+
+    @tasks.loop(minutes=15)
+    async def reconcile_top_caches(self):
+        """Re-sync cached guilds against the DB and drop caches nobody has read lately."""
+        now = time.monotonic()
+        for guild_id, cache in list(self.top_caches.items()):
+            if now - cache.last_used > self.CACHE_IDLE_SECONDS:
+                del self.top_caches[guild_id]
+                continue
+            try:
+                self._load_top_cache(guild_id).last_used = cache.last_used
+            except Exception as e:
+                self.logger.error(
+                    "Failed to reconcile leaderboard cache: %s", e,
+                    extra={"cog": "Leaderboard", "guild_id": guild_id, "event": "reconcile"}
+                )
+                record_error(self.bot, e, "task:reconcile_top_caches")
+        for guild_id, index in list(self.rank_indexes.items()):
+            if now - index.last_used > self.CACHE_IDLE_SECONDS:
+                del self.rank_indexes[guild_id]
+            elif now - index.built_at > self.RANK_INDEX_REBUILD_SECONDS:
+                # XP updates that land while the rebuild streams the collection may or may not
+                # be in the new index, so a few ranks can be off by a little until the next
+                # rebuild; replaying them could count a member twice, which is worse.
+                try:
+                    rebuilt = await asyncio.to_thread(self._build_rank_index, guild_id)
+                except Exception as e:
+                    self.logger.error(
+                        "Failed to rebuild rank index: %s", e,
+                        extra={"cog": "Leaderboard", "guild_id": guild_id, "event": "rank_index"}
+                    )
+                    record_error(self.bot, e, "task:reconcile_top_caches")
+                    continue
+                # Dropped (levels recalculated) while we were building: leave it to the next read
+                if self.rank_indexes.get(guild_id) is index:
+                    rebuilt.last_used = index.last_used
+                    self.rank_indexes[guild_id] = rebuilt
+
+    reconcile_top_caches.error(loop_error_handler("reconcile_top_caches"))
 
     @app_commands.command(
         name="leaderboard",
-        description="Show the top 10 XP holders in this server."
+        description="Show the XP leaderboard for this server."
     )
-    async def leaderboard(self, interaction: discord.Interaction):
+    @app_commands.describe(period="All-time XP (default), or XP earned this week/month.")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="all time", value="all"),
+        app_commands.Choice(name="this week", value="week"),
+        app_commands.Choice(name="this month", value="month"),
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, period: Optional[app_commands.Choice[str]] = None):
         """
-        Fetch the top 10 users by XP for the current guild and display them.
+        Show the first page (top 10, served from the in-memory cache) with buttons to page through the rest.
+        Weekly/monthly boards are aggregated from the daily XP buckets.
         """
-        guild_id_str = str(interaction.guild.id)
-        
-        # 1) Fetch top 10 documents
-        top_docs = self.levels.find({"guildId": guild_id_str}).sort("xp", -1).limit(10)
+        if period and period.value in self.PERIOD_DAYS:
+            await self.send_period_leaderboard(interaction, period)
+            return
+
+        entries = self.get_top(interaction.guild.id, LeaderboardView.PAGE_SIZE)
+        view = LeaderboardView(self, interaction.guild, interaction.user.id, entries)
+        embed = await view.render()
+        await interaction.response.send_message(embed=embed, view=view)
+        view.message = await interaction.original_response()
+        view.prefetch_next()
+
+    async def send_period_leaderboard(self, interaction: discord.Interaction, period: app_commands.Choice[str]):
+        await interaction.response.defer()
+        entries = await self.get_period_top(interaction.guild.id, self.PERIOD_DAYS[period.value])
+        names = await self.resolve_names(interaction.guild, [user_id for user_id, _ in entries])
 
-        # 2) Build an embed
         embed = discord.Embed(
             title=f"Leaderboard for {interaction.guild.name}",
-            description="Top 10 members by XP",
+            description=f"Top 10 members by XP earned {period.name}",
             color=discord.Color.gold()
         )
-
-        # 3) Fill embed with user data
-        rank = 1
-        for doc in top_docs:
-            user_id = doc["userId"]
-            xp = doc.get("xp", 0)
-            level = doc.get("level", 1)
-
-            try:
-                # Try to fetch user from Discord so we can display a name
-                user = await self.bot.fetch_user(int(user_id))
-                username = user.name
-            except Exception:
-                # Fallback in case user not found
-                username = f"User ID {user_id}"
-
-            embed.add_field(
-                name=f"#{rank} — {username}",
-                value=f"Level {level} ({xp} XP)",
-                inline=False
-            )
-            rank += 1
-
-        await interaction.response.send_message(embed=embed)
+        for rank, (user_id, xp) in enumerate(entries, start=1):
+            embed.add_field(name=f"#{rank} — {names[user_id]}", value=f"{xp} XP", inline=False)
+        if not entries:
+            embed.description = f"No XP earned {period.name} yet."
+        await interaction.followup.send(embed=embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Leaderboard(bot))
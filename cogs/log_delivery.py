@@ -0,0 +1,229 @@
+# cogs/log_delivery.py
+
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+from collections import defaultdict
+import time
+
+from cogs.error_sink import record_error, loop_error_handler
+
+
+async def deliver_log(bot: commands.Bot, channel: discord.TextChannel, content: str = None, embed: discord.Embed = None):
+    """
+    Send a log/announcement message to `channel`, going through LogDelivery when it is loaded
+    so guilds in webhook mode get batched delivery. Falls back to a plain channel send.
+    """
+    delivery = bot.get_cog("LogDelivery")
+    if delivery:
+        await delivery.send(channel, content=content, embed=embed)
+    else:
+        await channel.send(content=content, embed=embed)
+
+
+class LogDelivery(commands.Cog):
+    """
+    Delivers messages for log channels. Guilds can opt into a webhook mode where one webhook
+    is provisioned per log channel and queued embeds are sent in batches of up to 10 per
+    request, keeping log traffic off the bot's own channel send bucket.
+    """
+
+    WEBHOOK_NAME = "XD Logs"
+    MAX_EMBEDS = 10
+    MAX_CONTENT = 2000
+    MAX_EMBED_CHARS = 6000  # combined text of all embeds in one message
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = bot.logger
+        self.guild_settings = bot.guild_settings
+
+        self.webhook_guilds = set()  # guild IDs with log_delivery == "webhook"
+        self.webhooks = {}  # {channel_id: discord.Webhook}
+        self.pending = defaultdict(list)  # {channel_id: [(content, embed)]}
+        self.channels = {}  # {channel_id: discord.TextChannel} for queued channels
+
+        # Throughput metrics per delivery path
+        self.stats = {
+            path: {"messages": 0, "requests": 0, "failures": 0, "seconds": 0.0}
+            for path in ("channel", "webhook")
+        }
+
+    async def cog_load(self):
+        for doc in self.guild_settings.find({"log_delivery": "webhook"}, {"guildId": 1}):
+            self.webhook_guilds.add(int(doc["guildId"]))
+        self.flush_pending.start()
+
+    async def cog_unload(self):
+        self.flush_pending.cancel()
+        for channel_id in list(self.pending):
+            await self.flush_channel(channel_id)
+
+    # ================================================================
+    #                   Slash Command
+    # ================================================================
+    @app_commands.command(name="setlogdelivery", description="Choose how log messages are delivered (channel or webhook).")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="channel", value="channel"),
+        app_commands.Choice(name="webhook", value="webhook"),
+    ])
+    @app_commands.checks.has_permissions(manage_webhooks=True)
+    async def set_log_delivery(self, interaction: discord.Interaction, mode: app_commands.Choice[str]):
+        """
+        /setlogdelivery mode:webhook
+        Webhook mode needs the Manage Webhooks permission in the log channel.
+        """
+        self.guild_settings.update_one(
+            {"guildId": str(interaction.guild.id)},
+            {"$set": {"log_delivery": mode.value}},
+            upsert=True
+        )
+        if mode.value == "webhook":
+            self.webhook_guilds.add(interaction.guild.id)
+        else:
+            self.webhook_guilds.discard(interaction.guild.id)
+        await interaction.response.send_message(f"Log delivery set to **{mode.value}**.", ephemeral=True)
+
+    # ================================================================
+    #                   Delivery
+    # ================================================================
+    async def send(self, channel: discord.TextChannel, content: str = None, embed: discord.Embed = None):
+        """Queue the message for webhook delivery, or send it straight to the channel."""
+        if channel.guild.id not in self.webhook_guilds:
+            await self._send_via_channel(channel, content, [embed] if embed else [])
+            return
+
+        self.channels[channel.id] = channel
+        self.pending[channel.id].append((content, embed))
+        embed_count = sum(1 for _, e in self.pending[channel.id] if e)
+        if embed_count >= self.MAX_EMBEDS:
+            await self.flush_channel(channel.id)
+
+    @tasks.loop(seconds=2)
+    async def flush_pending(self):
+        for channel_id in list(self.pending):
+            try:
+                await self.flush_channel(channel_id)
+            except Exception as e:
+                self.logger.error(
+                    "Failed to flush log queue for channel %s: %s", channel_id, e,
+                    extra={"cog": "LogDelivery", "event": "flush"}
+                )
+                record_error(self.bot, e, "task:flush_pending")
+
+    flush_pending.error(loop_error_handler("flush_pending"))
+
+    async def flush_channel(self, channel_id: int):
+        items = self.pending.pop(channel_id, [])
+        channel = self.channels.pop(channel_id, None)
+        if not items or channel is None:
+            return
+
+        # Pack queued items into as few requests as possible
+        content_lines, embeds, length, embed_chars = [], [], 0, 0
+        for content, embed in items:
+            content_full = content and length + len(content) + 1 > self.MAX_CONTENT
+            embeds_full = embed and (
+                len(embeds) >= self.MAX_EMBEDS or embed_chars + len(embed) > self.MAX_EMBED_CHARS
+            )
+            if (content_full or embeds_full) and (content_lines or embeds):
+                await self._send_batch(channel, "\n".join(content_lines), embeds, len(content_lines) + len(embeds))
+                content_lines, embeds, length, embed_chars = [], [], 0, 0
+            if content:
+                content_lines.append(content[:self.MAX_CONTENT])
+                length += len(content_lines[-1]) + 1
+            if embed:
+                embeds.append(embed)
+                embed_chars += len(embed)
+        if content_lines or embeds:
+            await self._send_batch(channel, "\n".join(content_lines), embeds, len(content_lines) + len(embeds))
+
+    async def _send_batch(self, channel: discord.TextChannel, content: str, embeds: list, message_count: int):
+        webhook = await self._get_webhook(channel)
+        if webhook is None:
+            await self._send_via_channel(channel, content, embeds, message_count)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self._webhook_send(webhook, content, embeds)
+        except discord.NotFound:
+            # Webhook was deleted from under us: provision a new one and retry once
+            self.webhooks.pop(channel.id, None)
+            webhook = await self._get_webhook(channel)
+            if webhook is None:
+                await self._send_via_channel(channel, content, embeds, message_count)
+                return
+            try:
+                await self._webhook_send(webhook, content, embeds)
+            except discord.HTTPException:
+                self.webhooks.pop(channel.id, None)
+                self.stats["webhook"]["failures"] += 1
+                await self._send_via_channel(channel, content, embeds, message_count)
+                return
+        except discord.HTTPException as e:
+            self.stats["webhook"]["failures"] += 1
+            self.logger.error(
+                "Webhook delivery failed for channel %s: %s", channel.id, e,
+                extra={"cog": "LogDelivery", "guild_id": channel.guild.id, "event": "webhook_send"}
+            )
+            await self._send_via_channel(channel, content, embeds, message_count)
+            return
+        self._record("webhook", message_count, time.perf_counter() - started)
+
+    async def _webhook_send(self, webhook: discord.Webhook, content: str, embeds: list):
+        await webhook.send(
+            content=content or None,
+            embeds=embeds or discord.utils.MISSING,
+            username=self.bot.user.name if self.bot.user else self.WEBHOOK_NAME,
+            avatar_url=self.bot.user.display_avatar.url if self.bot.user else None
+        )
+
+    async def _send_via_channel(self, channel: discord.TextChannel, content: str, embeds: list, message_count: int = 1):
+        started = time.perf_counter()
+        try:
+            await channel.send(content=content or None, embeds=embeds or discord.utils.MISSING)
+        except discord.HTTPException:
+            self.stats["channel"]["failures"] += 1
+            raise
+        self._record("channel", message_count, time.perf_counter() - started)
+
+    async def _get_webhook(self, channel: discord.TextChannel):
+        """Return the cached webhook for `channel`, reusing or creating one if needed."""
+        webhook = self.webhooks.get(channel.id)
+        if webhook:
+            return webhook
+
+        try:
+            for existing in await channel.webhooks():
+                if existing.name == self.WEBHOOK_NAME and existing.token and existing.user == self.bot.user:
+                    webhook = existing
+                    break
+            if webhook is None:
+                webhook = await channel.create_webhook(name=self.WEBHOOK_NAME, reason="Log delivery")
+        except discord.Forbidden:
+            return None
+
+        self.webhooks[channel.id] = webhook
+        return webhook
+
+    def _record(self, path: str, message_count: int, seconds: float):
+        stats = self.stats[path]
+        stats["messages"] += message_count
+        stats["requests"] += 1
+        stats["seconds"] += seconds
+
+    def throughput_report(self) -> str:
+        lines = []
+        for path, stats in self.stats.items():
+            rate = stats["messages"] / stats["seconds"] if stats["seconds"] else 0.0
+            per_request = stats["messages"] / stats["requests"] if stats["requests"] else 0.0
+            lines.append(
+                f"**{path}**: {stats['messages']} messages in {stats['requests']} requests "
+                f"({per_request:.1f}/request, {rate:.1f} msg/s, {stats['failures']} failures)"
+            )
+        lines.append(f"Cached webhooks: {len(self.webhooks)}, queued channels: {len(self.pending)}")
+        return "\n".join(lines)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(LogDelivery(bot))
@@ -5,6 +5,10 @@ from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timezone
 
+from cogs.log_delivery import deliver_log
+
+LOG_SAMPLE_RATE = 0.05  # fraction of per-event log lines kept
+
 class LoggingEnhancements(commands.Cog):
     """
     Cog to handle enhanced logging: message edits, deletes, member leaves, etc.
@@ -101,7 +105,8 @@ class LoggingEnhancements(commands.Cog):
         embed.add_field(name="Before", value=before.content or "[No content]", inline=False)
         embed.add_field(name="After", value=after.content or "[No content]", inline=False)
 
-        await log_channel.send(embed=embed)
+        await deliver_log(self.bot, log_channel, embed=embed)
+        self._log_delivered("message_edit", before.guild.id)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -131,7 +136,8 @@ class LoggingEnhancements(commands.Cog):
         embed.add_field(name="Channel", value=message.channel.mention, inline=True)
         embed.add_field(name="Content", value=message.content or "[No content]", inline=False)
 
-        await log_channel.send(embed=embed)
+        await deliver_log(self.bot, log_channel, embed=embed)
+        self._log_delivered("message_delete", message.guild.id)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -157,7 +163,15 @@ class LoggingEnhancements(commands.Cog):
         )
         embed.add_field(name="User", value=f"{member} ({member.id})", inline=False)
         
-        await log_channel.send(embed=embed)
+        await deliver_log(self.bot, log_channel, embed=embed)
+        self._log_delivered("member_leave", member.guild.id)
+
+    def _log_delivered(self, event: str, guild_id: int):
+        # These fire on every edit/delete/leave, so only a sample is kept
+        self.logger.info(
+            "Delivered %s log", event,
+            extra={"cog": "LoggingEnhancements", "guild_id": guild_id, "event": event, "sample_rate": LOG_SAMPLE_RATE}
+        )
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(LoggingEnhancements(bot))
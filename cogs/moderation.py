@@ -3,47 +3,279 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
+from collections import Counter
+import aiohttp
+import asyncio
+import csv
+import io
 import os
 import logging
 import re
+import time
+
+from cogs.log_delivery import deliver_log
+from cogs.error_sink import record_error
+
+MAX_MESSAGE_LENGTH = 2000
+SNOWFLAKE_PATTERN = re.compile(r"\b\d{17,20}\b")
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> list:
+    """Split `text` into chunks of at most `limit` characters, breaking on newlines where possible."""
+    chunks, current = [], ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + len(line) + 1 > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
+
+
+class CasesView(discord.ui.View):
+    """Paginated case history, fetched with caseId keyset cursors (newest first)."""
+
+    PAGE_SIZE = 10
+
+    def __init__(self, cog: "Moderation", guild: discord.Guild, author_id: int, filters: dict, title: str, entries: list):
+        super().__init__(timeout=120)
+        self.cog = cog
+        self.guild = guild
+        self.author_id = author_id
+        self.filters = filters
+        self.title = title
+        self.entries = entries  # case docs for the current page
+        self.page = 0
+        self.message = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run /cases yourself to page through it.", ephemeral=True)
+            return False
+        return True
+
+    def render(self) -> discord.Embed:
+        embed = discord.Embed(title=self.title, description=f"Page {self.page + 1}", color=discord.Color.orange())
+        for case in self.entries:
+            timestamp = case["timestamp"].replace(tzinfo=timezone.utc)
+            embed.add_field(
+                name=f"Case #{case['caseId']} — {case['type']}",
+                value=(
+                    f"<@{case['userId']}> by <@{case['moderatorId']}> {discord.utils.format_dt(timestamp, 'R')}\n"
+                    f"{case.get('reason') or 'No reason provided.'}"
+                )[:1024],
+                inline=False
+            )
+        if not self.entries:
+            embed.description = "No cases found."
+
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = len(self.entries) < self.PAGE_SIZE
+        return embed
+
+    @discord.ui.button(label="Newer", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        entries = self.cog.fetch_cases(self.guild.id, self.filters, self.entries[0]["caseId"], False, self.PAGE_SIZE)
+        if not entries:
+            button.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        self.page -= 1
+        self.entries = entries
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Older", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        entries = self.cog.fetch_cases(self.guild.id, self.filters, self.entries[-1]["caseId"], True, self.PAGE_SIZE)
+        if not entries:
+            button.disabled = True
+            await interaction.response.edit_message(view=self)
+            return
+        self.page += 1
+        self.entries = entries
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
 
 
 class Moderation(commands.Cog):
+    BULK_CONCURRENCY = 5  # kick/ban each have a per-guild route bucket of about 5 requests
+    PROGRESS_INTERVAL = 2  # seconds between progress edits
+    MASSBAN_LIMIT = 10_000
+    MASSBAN_PACE = 0.2  # seconds each worker waits between bans
+    INTERACTION_TTL = timedelta(minutes=14)  # tokens expire after 15; leave a margin
+    PURGE_SCAN_LIMIT = 50_000  # messages /purge will look through at most
+    BULK_DELETE_SIZE = 100
+    OLD_DELETE_PACE = 1.0  # seconds between single deletes of messages older than 14 days
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = bot.logger
         self.guild_settings = bot.guild_settings
         self.moderation_logs = bot.moderation_logs
-        self.muted_users = {}  # {user_id: [role_ids]}
+        self.infraction_counts = bot.infraction_counts  # Per-(guild, user) warning totals
+        self.mutes = bot.mutes  # Active mutes with the roles to restore, per (guild, user)
+        self.ban_cache = {}  # {guild_id: {banned user_ids}}
+
+    async def cog_load(self):
+        self.infraction_counts.create_index([("guildId", ASCENDING), ("userId", ASCENDING)], unique=True)
+        self.moderation_logs.create_index([("guildId", ASCENDING), ("userId", ASCENDING), ("type", ASCENDING)])
+        # Case history: one index per /cases filter, newest case first
+        has_case = {"caseId": {"$exists": True}}
+        self.moderation_logs.create_index(
+            [("guildId", ASCENDING), ("caseId", DESCENDING)], unique=True, partialFilterExpression=has_case
+        )
+        self.moderation_logs.create_index(
+            [("guildId", ASCENDING), ("userId", ASCENDING), ("caseId", DESCENDING)], partialFilterExpression=has_case
+        )
+        self.moderation_logs.create_index(
+            [("guildId", ASCENDING), ("moderatorId", ASCENDING), ("caseId", DESCENDING)], partialFilterExpression=has_case
+        )
+        self.mutes.create_index([("guildId", ASCENDING), ("userId", ASCENDING)], unique=True)
+
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler:
+            scheduler.register("unmute", self.scheduled_unmute)
+            scheduler.register("unban", self.scheduled_unban)
+            scheduler.register("remove_role", self.scheduled_remove_role)
 
     # ========== /warn ==========
     @app_commands.command(name="warn", description="Warn a user")
     @app_commands.checks.has_permissions(manage_roles=True)
     async def warn(self, interaction: discord.Interaction, user: discord.Member, reason: str = "No reason provided."):
         guild_id_str = str(interaction.guild.id)
-        log_entry = {
-            "type": "warning",
-            "guildId": guild_id_str,
-            "userId": str(user.id),
-            "moderatorId": str(interaction.user.id),
-            "timestamp": datetime.utcnow(),
-            "reason": reason
-        }
-        self.moderation_logs.insert_one(log_entry)
-
-        warning_count = self.moderation_logs.count_documents({
-            "guildId": guild_id_str, 
-            "userId": str(user.id), 
-            "type": "warning"
-        })
+        self.record_cases(interaction.guild.id, "warning", [user.id], interaction.user.id, reason)
+        key = {"guildId": guild_id_str, "userId": str(user.id)}
+        counter = self.infraction_counts.find_one_and_update(
+            key, {"$inc": {"warnings": 1}}, return_document=ReturnDocument.AFTER
+        )
+        if counter is not None:
+            warning_count = counter["warnings"]
+        else:
+            # No counter yet (e.g. warnings logged before counters existed): seed it from the
+            # logs once, which already include this warning. $max keeps concurrent seeds consistent.
+            warning_count = self.moderation_logs.count_documents({**key, "type": "warning"})
+            self.infraction_counts.update_one(key, {"$max": {"warnings": warning_count}}, upsert=True)
 
         await interaction.response.send_message(
             f"{user.mention} has been warned. Total warnings: {warning_count}."
         )
         await self.send_moderation_log(interaction, f"**{interaction.user}** warned **{user}**. Reason: {reason}. Total warnings: {warning_count}.")
 
+    async def rebuild_warning_counts(self, guild_id: Optional[int] = None) -> int:
+        """
+        Recompute the warning counters from moderationLogs, for all guilds or just one.
+        Returns the number of (guild, user) counters written.
+        """
+        scope = {"guildId": str(guild_id)} if guild_id else {}
+
+        def rebuild():
+            self.infraction_counts.update_many(scope, {"$set": {"warnings": 0}})
+            self.moderation_logs.aggregate([
+                {"$match": {**scope, "type": "warning"}},
+                {"$group": {"_id": {"guildId": "$guildId", "userId": "$userId"}, "warnings": {"$sum": 1}}},
+                {"$project": {"_id": 0, "guildId": "$_id.guildId", "userId": "$_id.userId", "warnings": 1}},
+                {"$merge": {
+                    "into": self.infraction_counts.name,
+                    "on": ["guildId", "userId"],
+                    "whenMatched": "merge",
+                    "whenNotMatched": "insert"
+                }},
+            ])
+            return self.infraction_counts.count_documents({**scope, "warnings": {"$gt": 0}})
+
+        return await asyncio.to_thread(rebuild)
+
+    # ========== Cases ==========
+    def record_cases(self, guild_id: int, action: str, user_ids: list, moderator_id: int, reason: str, **details) -> int:
+        """
+        Record one case per user for a moderation action and return the first case number.
+        Numbers come from a per-guild counter, reserved for the whole batch with a single $inc.
+        """
+        if not user_ids:
+            return 0
+        settings = self.guild_settings.find_one_and_update(
+            {"guildId": str(guild_id)},
+            {"$inc": {"case_counter": len(user_ids)}},
+            projection={"case_counter": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first_case = settings["case_counter"] - len(user_ids) + 1
+        now = datetime.utcnow()
+        self.moderation_logs.insert_many([
+            {
+                "type": action,
+                "caseId": first_case + offset,
+                "guildId": str(guild_id),
+                "userId": str(user_id),
+                "moderatorId": str(moderator_id),
+                "timestamp": now,
+                "reason": reason,
+                **details
+            }
+            for offset, user_id in enumerate(user_ids)
+        ], ordered=False)
+        return first_case
+
+    def fetch_cases(self, guild_id: int, filters: dict, cursor: Optional[int], forward: bool, count: int) -> list:
+        """
+        Keyset page of case docs ordered by caseId desc, starting right after (forward, older)
+        or right before (backward, newer) the `cursor` case number.
+        """
+        query = {"guildId": str(guild_id), **filters, "caseId": {"$exists": True}}
+        if cursor is not None:
+            query["caseId"] = {"$lt": cursor} if forward else {"$gt": cursor}
+        docs = list(self.moderation_logs.find(query, {"_id": 0}).sort("caseId", DESCENDING if forward else ASCENDING).limit(count))
+        if not forward:
+            docs.reverse()
+        return docs
+
+    # ========== /cases ==========
+    @app_commands.command(name="cases", description="Browse moderation cases for a user or moderator.")
+    @app_commands.describe(
+        user="Only show cases against this user.",
+        moderator="Only show cases handled by this moderator."
+    )
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def cases(
+        self,
+        interaction: discord.Interaction,
+        user: Optional[discord.User] = None,
+        moderator: Optional[discord.User] = None
+    ):
+        filters = {}
+        title = f"Cases in {interaction.guild.name}"
+        if user:
+            filters["userId"] = str(user.id)
+            title = f"Cases for {user}"
+        if moderator:
+            filters["moderatorId"] = str(moderator.id)
+            title += f" by {moderator}"
+
+        entries = self.fetch_cases(interaction.guild.id, filters, None, True, CasesView.PAGE_SIZE)
+        view = CasesView(self, interaction.guild, interaction.user.id, filters, title, entries)
+        await interaction.response.send_message(embed=view.render(), view=view, ephemeral=True)
+        view.message = await interaction.original_response()
+
     # Helper to send messages to log channel
     async def send_moderation_log(self, interaction: discord.Interaction, message: str):
         guild_id_str = str(interaction.guild.id)
@@ -52,7 +284,7 @@ class Moderation(commands.Cog):
             log_channel_id = int(guild_settings_data["logChannel"])
             log_channel = interaction.guild.get_channel(log_channel_id)
             if log_channel:
-                await log_channel.send(message)
+                await deliver_log(self.bot, log_channel, content=message)
 
     # ========== /timeout (prefix command) ==========
     @app_commands.command(name="timeout", description="Timeout a user temporarily.")
@@ -62,11 +294,12 @@ class Moderation(commands.Cog):
         try:
             timeout_until = discord.utils.utcnow() + timedelta(minutes=duration)
             await member.timeout(until=timeout_until, reason=reason)
+            self.record_cases(member.guild.id, "timeout", [member.id], ctx.user.id, reason, duration=duration * 60)
             await ctx.send(f"{member.mention} has been timed out for {duration} minutes. Reason: {reason}")
         except discord.Forbidden:
             await ctx.send("I don't have permission to timeout this user.")
         except Exception as e:
-            self.logger.error(f"Error timing out {member}: {e}")
+            self.logger.error("Error timing out %s: %s", member, e, extra={"cog": "Moderation", "guild_id": member.guild.id})
             await ctx.send("An error occurred while timing out the user.")
 
     ### 🔨 **Kick Command**
@@ -85,37 +318,15 @@ class Moderation(commands.Cog):
         """
         Kicks multiple members from the server.
         """
-        # Parse member mentions or IDs
         member_ids = self.extract_member_ids(members)
         if not member_ids:
             await interaction.response.send_message("❌ No valid member mentions or IDs found.", ephemeral=True)
             return
 
-        success_messages = []
-        failure_messages = []
+        async def kick_member(member: discord.Member):
+            await member.kick(reason=f"{reason} | Kicked by {interaction.user}")
 
-        for member_id in member_ids:
-            member = interaction.guild.get_member(member_id)
-            if not member:
-                failure_messages.append(f"⚠️ Member with ID `{member_id}` not found.")
-                continue
-            try:
-                await member.kick(reason=f"{reason} | Kicked by {interaction.user}")
-                success_messages.append(f"✅ Kicked {member.mention}.")
-            except discord.Forbidden:
-                failure_messages.append(f"⚠️ Failed to kick {member.mention}. Insufficient permissions.")
-            except Exception as e:
-                self.logger.error(f"Error kicking {member}: {e}")
-                failure_messages.append(f"⚠️ Error kicking {member.mention}.")
-
-        # Compile response
-        response = ""
-        if success_messages:
-            response += "\n".join(success_messages)
-        if failure_messages:
-            response += "\n".join(failure_messages)
-
-        await interaction.response.send_message(response if response else "No actions were performed.", ephemeral=True)
+        await self.run_bulk_action(interaction, member_ids, "kick", "Kicked", kick_member, reason)
 
     ### 🛡️ **Ban Command**
     @app_commands.command(name="ban", description="Ban multiple users from the server.")
@@ -133,49 +344,257 @@ class Moderation(commands.Cog):
         """
         Bans multiple members from the server.
         """
-        # Parse member mentions or IDs
         member_ids = self.extract_member_ids(members)
         if not member_ids:
             await interaction.response.send_message("❌ No valid member mentions or IDs found.", ephemeral=True)
             return
 
-        success_messages = []
-        failure_messages = []
+        async def ban_member(member: discord.Member):
+            await member.ban(reason=f"{reason} | Banned by {interaction.user}")
+
+        await self.run_bulk_action(interaction, member_ids, "ban", "Banned", ban_member, reason)
+
+    async def run_bulk_action(self, interaction: discord.Interaction, member_ids: list, verb: str, past: str, action, reason: str):
+        """
+        Run `action` on each member concurrently, capped at BULK_CONCURRENCY so we stay inside
+        the kick/ban route bucket instead of tripping 429s. The interaction is deferred first
+        and the progress message is edited as results come in. Each success is recorded as a case.
+        """
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        member_ids = list(dict.fromkeys(member_ids))
+        semaphore = asyncio.Semaphore(self.BULK_CONCURRENCY)
+        done_ids = []
 
-        for member_id in member_ids:
+        async def run(member_id: int):
             member = interaction.guild.get_member(member_id)
             if not member:
-                failure_messages.append(f"⚠️ Member with ID `{member_id}` not found.")
-                continue
+                return False, f"⚠️ Member with ID `{member_id}` not found."
+            async with semaphore:
+                try:
+                    await action(member)
+                    done_ids.append(member.id)
+                    return True, f"✅ {past} {member.mention}."
+                except discord.Forbidden:
+                    return False, f"⚠️ Failed to {verb} {member.mention}. Insufficient permissions."
+                except discord.HTTPException as e:
+                    self.logger.error(
+                        "Error during bulk %s of %s: %s", verb, member, e,
+                        extra={"cog": "Moderation", "guild_id": interaction.guild_id, "event": f"bulk_{verb}"}
+                    )
+                    return False, f"⚠️ Error trying to {verb} {member.mention}."
+
+        success_messages = []
+        failure_messages = []
+        last_report = time.monotonic()
+        for result in asyncio.as_completed([run(member_id) for member_id in member_ids]):
+            ok, line = await result
+            (success_messages if ok else failure_messages).append(line)
+            done = len(success_messages) + len(failure_messages)
+            if done < len(member_ids) and time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await self.report_progress(
+                    interaction,
+                    f"⏳ {done}/{len(member_ids)} processed "
+                    f"({len(success_messages)} {past.lower()}, {len(failure_messages)} failed)…"
+                )
+
+        try:
+            await asyncio.to_thread(self.record_cases, interaction.guild.id, verb, done_ids, interaction.user.id, reason)
+            if verb == "ban":
+                await asyncio.to_thread(self.cancel_unbans, interaction.guild.id, done_ids)
+        except Exception as e:
+            # The actions already happened; still tell the moderator what was done
+            self.logger.error(
+                "Failed to record bulk %s cases: %s", verb, e,
+                extra={"cog": "Moderation", "guild_id": interaction.guild_id, "event": f"bulk_{verb}"}
+            )
+            record_error(self.bot, e, f"bulk_{verb}")
+        header = f"{past} {len(success_messages)} of {len(member_ids)} member(s)."
+        chunks = split_message("\n".join([header] + success_messages + failure_messages))
+        await self.report_progress(interaction, chunks[0], final=True)
+        for chunk in chunks[1:]:
             try:
-                await member.ban(reason=f"{reason} | Banned by {interaction.user}")
-                success_messages.append(f"✅ Banned {member.mention}.")
-            except discord.Forbidden:
-                failure_messages.append(f"⚠️ Failed to ban {member.mention}. Insufficient permissions.")
-            except Exception as e:
-                self.logger.error(f"Error banning {member}: {e}")
-                failure_messages.append(f"⚠️ Error banning {member.mention}.")
-
-        # Compile response
-        response = ""
-        if success_messages:
-            response += "\n".join(success_messages)
-        if failure_messages:
-            response += "\n".join(failure_messages)
-
-        await interaction.response.send_message(response if response else "No actions were performed.", ephemeral=True)
+                await interaction.followup.send(chunk, ephemeral=True)
+            except discord.HTTPException:
+                break  # Token expired; the first message already has the totals
+
+    ### 📄 **Mass Ban Command**
+    @app_commands.command(name="massban", description="Ban up to 10,000 user IDs from a text/CSV file, members or not.")
+    @app_commands.describe(
+        file="A .txt or .csv file containing user IDs (one per line or comma separated).",
+        reason="Provide a reason for the bans."
+    )
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def massban(
+        self,
+        interaction: discord.Interaction,
+        file: discord.Attachment,
+        reason: Optional[str] = "No reason provided."
+    ):
+        """
+        Pre-emptively bans user IDs, including accounts that already left the server.
+        Results are attached as a CSV summary instead of being listed in the message.
+        """
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        guild = interaction.guild
+
+        user_ids = {}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(file.url) as response:
+                if response.status != 200:
+                    await interaction.edit_original_response(content=f"❌ Couldn't download the file (HTTP {response.status}).")
+                    return
+                tail = ""
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    # Hold back trailing digits in case an ID is split across chunks
+                    text = tail + chunk.decode("ascii", "ignore")
+                    cut = len(text.rstrip("0123456789"))
+                    text, tail = text[:cut], text[cut:]
+                    for match in SNOWFLAKE_PATTERN.finditer(text):
+                        user_ids[int(match.group(0))] = None
+                    if len(user_ids) > self.MASSBAN_LIMIT:
+                        await interaction.edit_original_response(
+                            content=f"❌ The file has more than {self.MASSBAN_LIMIT:,} IDs. Split it up and try again."
+                        )
+                        return
+                for match in SNOWFLAKE_PATTERN.finditer(tail):
+                    user_ids[int(match.group(0))] = None
+        if not user_ids:
+            await interaction.edit_original_response(content="❌ No user IDs found in the file.")
+            return
+
+        banned = await self.get_ban_set(guild)
+        results = {}  # {user_id: result}
+        to_ban = []
+        for user_id in user_ids:
+            if user_id in banned:
+                results[user_id] = "already banned"
+            elif user_id in (interaction.user.id, guild.owner_id, guild.me.id):
+                results[user_id] = "skipped"
+            else:
+                to_ban.append(user_id)
+
+        semaphore = asyncio.Semaphore(self.BULK_CONCURRENCY)
+        ban_reason = f"{reason} | Mass ban by {interaction.user}"
+
+        async def run(user_id: int):
+            async with semaphore:
+                try:
+                    await guild.ban(discord.Object(id=user_id), reason=ban_reason, delete_message_seconds=0)
+                    banned.add(user_id)
+                    results[user_id] = "banned"
+                except discord.NotFound:
+                    results[user_id] = "unknown user"
+                except discord.Forbidden:
+                    results[user_id] = "missing permissions"
+                except discord.HTTPException as e:
+                    results[user_id] = f"error: {e.status}"
+                await asyncio.sleep(self.MASSBAN_PACE)
+
+        last_report = time.monotonic()
+        for done, result in enumerate(asyncio.as_completed([run(user_id) for user_id in to_ban]), start=1):
+            await result
+            if time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await self.report_progress(interaction, f"⏳ Banning… {done:,}/{len(to_ban):,}")
+
+        banned_ids = [user_id for user_id in to_ban if results[user_id] == "banned"]
+        await asyncio.to_thread(self.record_cases, guild.id, "ban", banned_ids, interaction.user.id, reason)
+        # Already-banned IDs may be temp-bans; this ban makes them permanent
+        await asyncio.to_thread(self.cancel_unbans, guild.id, [user_id for user_id in user_ids if results[user_id] in ("banned", "already banned")])
+
+        summary = io.StringIO()
+        writer = csv.writer(summary)
+        writer.writerow(["userId", "result"])
+        writer.writerows((user_id, results[user_id]) for user_id in user_ids)
+        counts = Counter(results.values())
+        self.logger.info(
+            "Mass ban in %s: %s", guild.id, dict(counts),
+            extra={"cog": "Moderation", "guild_id": guild.id, "event": "massban"}
+        )
+        await self.report_progress(
+            interaction,
+            f"Mass ban finished: {counts['banned']:,} banned, {counts['already banned']:,} already banned, "
+            f"{len(user_ids) - counts['banned'] - counts['already banned']:,} skipped or failed.",
+            final=True,
+            file_factory=lambda: discord.File(io.BytesIO(summary.getvalue().encode()), filename=f"massban-{guild.id}.csv")
+        )
+        await self.send_moderation_log(
+            interaction, f"**{interaction.user}** mass banned {counts['banned']:,} user(s). Reason: {reason}"
+        )
+
+    async def report_progress(self, interaction: discord.Interaction, content: str, final: bool = False, file_factory=None):
+        """
+        Edit the deferred response while its token is still valid (15 minutes). Once it has
+        expired, progress updates are dropped and the final report goes to the channel instead.
+        """
+        age = discord.utils.utcnow() - interaction.created_at
+        if age < self.INTERACTION_TTL:
+            try:
+                files = [file_factory()] if file_factory else discord.utils.MISSING
+                await interaction.edit_original_response(content=content, attachments=files)
+                return
+            except discord.HTTPException as e:
+                if not final:
+                    return
+                self.logger.warning(
+                    "Couldn't edit interaction response, reporting in channel: %s", e,
+                    extra={"cog": "Moderation", "guild_id": interaction.guild_id, "event": "report_progress"}
+                )
+        if final:
+            await interaction.channel.send(
+                f"{interaction.user.mention} {content}",
+                file=file_factory() if file_factory else discord.utils.MISSING,
+                allowed_mentions=discord.AllowedMentions(users=[interaction.user])
+            )
+
+    def cancel_unbans(self, guild_id: int, user_ids: list):
+        """Drop pending temp-ban expiries for users who are now banned permanently (or unbanned)."""
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler is not None and user_ids:
+            scheduler.cancel("unban", guild_id, userId={"$in": [str(user_id) for user_id in user_ids]})
+
+    async def get_ban_set(self, guild: discord.Guild) -> set:
+        """The guild's banned user IDs, fetched once and kept current by the ban/unban listeners."""
+        banned = self.ban_cache.get(guild.id)
+        if banned is None:
+            banned = {entry.user.id async for entry in guild.bans(limit=None)}
+            self.ban_cache[guild.id] = banned
+        return banned
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        if guild.id in self.ban_cache:
+            self.ban_cache[guild.id].add(user.id)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        if guild.id in self.ban_cache:
+            self.ban_cache[guild.id].discard(user.id)
+        self.cancel_unbans(guild.id, [user.id])
 
     ### 🚫 **Error Handling**
     @kick.error
     @ban.error
+    @massban.error
     async def moderation_error(self, interaction: discord.Interaction, error):
         if isinstance(error, app_commands.MissingPermissions):
             await interaction.response.send_message("❌ You don't have the required permissions to use this command.", ephemeral=True)
         elif isinstance(error, app_commands.MissingRequiredArgument):
             await interaction.response.send_message("❌ Missing required arguments. Please provide all necessary information.", ephemeral=True)
         else:
-            self.logger.error(f"Unexpected error in moderation commands: {error}")
-            await interaction.response.send_message("❌ An unexpected error occurred. Please try again later.", ephemeral=True)
+            self.logger.error(
+                "Unexpected error in moderation commands: %s", error,
+                extra={"cog": "Moderation", "guild_id": interaction.guild_id}
+            )
+            message = "❌ An unexpected error occurred. Please try again later."
+            if not interaction.response.is_done():
+                await interaction.response.send_message(message, ephemeral=True)
+                return
+            try:
+                await interaction.followup.send(message, ephemeral=True)
+            except discord.HTTPException:
+                pass  # The interaction token has expired; the error is already logged
 
     ### 🛠️ **Helper Method to Extract Member IDs**
     def extract_member_ids(self, members_str: str) -> list:
@@ -204,65 +623,304 @@ class Moderation(commands.Cog):
         return member_ids
 
     # ========== /mute ==========
+    def get_mute_role(self, guild: discord.Guild) -> Optional[discord.Role]:
+        settings = self.guild_settings.find_one({"guildId": str(guild.id)}, {"mute_role": 1})
+        if settings and "mute_role" in settings:
+            return guild.get_role(int(settings["mute_role"]))
+        return None
+
     @app_commands.command(name="mute", description="Mute a user")
+    @app_commands.describe(duration="Minutes until the mute is lifted automatically. Leave empty to mute until /unmute.")
     @app_commands.checks.has_permissions(manage_roles=True)
-    async def mute(self, interaction: discord.Interaction, user: discord.Member):
-        guild_id_str = str(interaction.guild.id)
-        moderation_settings = self.guild_settings.find_one({"guildId": guild_id_str})
-
-        if moderation_settings and "mute_role" in moderation_settings:
-            mute_role_id = moderation_settings["mute_role"]
-            mute_role = interaction.guild.get_role(int(mute_role_id))
-            if mute_role:
-                # Save current roles except @everyone
-                self.muted_users[user.id] = [r.id for r in user.roles[1:]]  
-                # Remove them all
-                await user.remove_roles(*user.roles[1:], reason="Muted")
-                # Add the mute role
-                await user.add_roles(mute_role, reason=f"Muted by {interaction.user}")
-                await interaction.response.send_message(f"{user.mention} has been muted.")
-            else:
-                await interaction.response.send_message("Mute role not found.", ephemeral=True)
-        else:
-            await interaction.response.send_message("Mute role not configured.", ephemeral=True)
+    async def mute(
+        self,
+        interaction: discord.Interaction,
+        user: discord.Member,
+        duration: Optional[app_commands.Range[int, 1, 40320]] = None
+    ):
+        guild = interaction.guild
+        mute_role = self.get_mute_role(guild)
+        if mute_role is None:
+            await interaction.response.send_message("Mute role not configured or not found.", ephemeral=True)
+            return
+        if mute_role in user.roles:
+            await interaction.response.send_message(f"{user.mention} is already muted.", ephemeral=True)
+            return
+
+        # Managed roles and roles above ours can't be removed, so they stay on the member
+        kept = [r for r in user.roles[1:] if r.managed or r >= guild.me.top_role]
+        removed = [r for r in user.roles[1:] if r not in kept]
+        try:
+            await user.edit(roles=kept + [mute_role], reason=f"Muted by {interaction.user}")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to mute this user.", ephemeral=True)
+            return
+
+        expires_at = datetime.utcnow() + timedelta(minutes=duration) if duration else None
+        self.mutes.update_one(
+            {"guildId": str(guild.id), "userId": str(user.id)},
+            {"$set": {
+                "roles": [r.id for r in removed],
+                "moderatorId": str(interaction.user.id),
+                "mutedAt": datetime.utcnow(),
+                "expiresAt": expires_at
+            }},
+            upsert=True
+        )
+        details = {"duration": duration * 60} if duration else {}
+        self.record_cases(guild.id, "mute", [user.id], interaction.user.id, None, **details)
+        scheduler = self.bot.get_cog("Scheduler")
+        if expires_at and scheduler:
+            await scheduler.schedule("unmute", expires_at, guild.id, userId=str(user.id))
+
+        until = f" until {discord.utils.format_dt(expires_at.replace(tzinfo=timezone.utc), 'f')}" if expires_at else ""
+        await interaction.response.send_message(f"{user.mention} has been muted{until}.")
+
+    async def lift_mute(self, guild: discord.Guild, member: discord.Member, mute_role: discord.Role, reason: str) -> bool:
+        """
+        Swap the mute role back for the stored roles in a single edit. Returns whether any
+        stored roles were found. The mute record is only dropped once the edit succeeds.
+        """
+        key = {"guildId": str(guild.id), "userId": str(member.id)}
+        doc = self.mutes.find_one(key, {"roles": 1})
+        stored = [
+            role for role_id in (doc or {}).get("roles", [])
+            if (role := guild.get_role(role_id)) and not role.managed and role < guild.me.top_role
+        ]
+        roles = [r for r in member.roles[1:] if r != mute_role]
+        roles += [r for r in stored if r not in roles]
+        await member.edit(roles=roles, reason=reason)
+        self.mutes.delete_one(key)
+        return doc is not None
 
     # ========== /unmute ==========
     @app_commands.command(name="unmute", description="Unmute a user")
     @app_commands.checks.has_permissions(manage_roles=True)
     async def unmute(self, interaction: discord.Interaction, user: discord.Member):
-        guild_id_str = str(interaction.guild.id)
-        moderation_settings = self.guild_settings.find_one({"guildId": guild_id_str})
-
-        if moderation_settings and "mute_role" in moderation_settings:
-            mute_role_id = moderation_settings["mute_role"]
-            mute_role = interaction.guild.get_role(int(mute_role_id))
-
-            if mute_role in user.roles:
-                await user.remove_roles(mute_role, reason="Unmuted")
-                if user.id in self.muted_users:
-                    roles_to_restore = []
-                    for rid in self.muted_users[user.id]:
-                        role_obj = interaction.guild.get_role(rid)
-                        if role_obj:
-                            roles_to_restore.append(role_obj)
-                    if roles_to_restore:
-                        await user.add_roles(*roles_to_restore, reason="Restored roles after unmute")
-                    del self.muted_users[user.id]
-                    await interaction.response.send_message(f"{user.mention} has been unmuted and roles restored.")
-                else:
-                    await interaction.response.send_message(f"{user.mention} was unmuted but had no stored roles.")
-            else:
-                await interaction.response.send_message(f"{user.mention} is not muted.")
+        mute_role = self.get_mute_role(interaction.guild)
+        if mute_role is None:
+            await interaction.response.send_message("Mute role not configured or not found.", ephemeral=True)
+            return
+        if mute_role not in user.roles:
+            await interaction.response.send_message(f"{user.mention} is not muted.")
+            return
+
+        try:
+            restored = await self.lift_mute(interaction.guild, user, mute_role, f"Unmuted by {interaction.user}")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to unmute this user.", ephemeral=True)
+            return
+        self.record_cases(interaction.guild.id, "unmute", [user.id], interaction.user.id, None)
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler:
+            scheduler.cancel("unmute", interaction.guild.id, userId=str(user.id))
+        if restored:
+            await interaction.response.send_message(f"{user.mention} has been unmuted and roles restored.")
         else:
-            await interaction.response.send_message("Mute role not configured.", ephemeral=True)
+            await interaction.response.send_message(f"{user.mention} was unmuted but had no stored roles.")
+
+    # ========== Timed actions ==========
+    async def scheduled_unmute(self, guild: discord.Guild, payload: dict):
+        member = guild.get_member(int(payload["userId"]))
+        mute_role = self.get_mute_role(guild)
+        if member is None or mute_role is None or mute_role not in member.roles:
+            self.mutes.delete_one({"guildId": str(guild.id), "userId": payload["userId"]})
+            return
+        await self.lift_mute(guild, member, mute_role, "Mute expired")
+        self.record_cases(guild.id, "unmute", [member.id], self.bot.user.id, "Mute expired")
+
+    async def scheduled_unban(self, guild: discord.Guild, payload: dict):
+        try:
+            await guild.unban(discord.Object(id=int(payload["userId"])), reason="Temporary ban expired")
+        except discord.NotFound:
+            return  # Already unbanned by hand
+        self.record_cases(guild.id, "unban", [int(payload["userId"])], self.bot.user.id, "Temporary ban expired")
+
+    async def scheduled_remove_role(self, guild: discord.Guild, payload: dict):
+        member = guild.get_member(int(payload["userId"]))
+        role = guild.get_role(int(payload["roleId"]))
+        if member and role and role in member.roles:
+            await member.remove_roles(role, reason="Temporary role expired")
+
+    # ========== /tempban ==========
+    @app_commands.command(name="tempban", description="Ban a user for a limited time.")
+    @app_commands.describe(
+        user="The user to ban (does not need to be in the server).",
+        duration="Hours until the ban is lifted.",
+        reason="Provide a reason for the ban."
+    )
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def tempban(
+        self,
+        interaction: discord.Interaction,
+        user: discord.User,
+        duration: app_commands.Range[int, 1, 8760],
+        reason: Optional[str] = "No reason provided."
+    ):
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler is None:
+            await interaction.response.send_message("Timed actions are unavailable right now.", ephemeral=True)
+            return
+        try:
+            await interaction.guild.ban(user, reason=f"{reason} | Temp-banned by {interaction.user} for {duration}h")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to ban this user.", ephemeral=True)
+            return
+
+        expires_at = datetime.utcnow() + timedelta(hours=duration)
+        scheduler.cancel("unban", interaction.guild.id, userId=str(user.id))
+        await scheduler.schedule("unban", expires_at, interaction.guild.id, userId=str(user.id))
+        self.record_cases(interaction.guild.id, "tempban", [user.id], interaction.user.id, reason, duration=duration * 3600)
+        await interaction.response.send_message(
+            f"{user.mention} has been banned until {discord.utils.format_dt(expires_at.replace(tzinfo=timezone.utc), 'f')}."
+        )
+
+    # ========== /temprole ==========
+    @app_commands.command(name="temprole", description="Give a member a role for a limited time.")
+    @app_commands.describe(duration="Hours until the role is removed.")
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def temprole(
+        self,
+        interaction: discord.Interaction,
+        member: discord.Member,
+        role: discord.Role,
+        duration: app_commands.Range[int, 1, 8760]
+    ):
+        scheduler = self.bot.get_cog("Scheduler")
+        if scheduler is None:
+            await interaction.response.send_message("Timed actions are unavailable right now.", ephemeral=True)
+            return
+        if role.managed or role >= interaction.guild.me.top_role:
+            await interaction.response.send_message("I can't assign that role.", ephemeral=True)
+            return
+        if interaction.user.id != interaction.guild.owner_id and role >= interaction.user.top_role:
+            await interaction.response.send_message("You can only give roles below your highest role.", ephemeral=True)
+            return
+        try:
+            await member.add_roles(role, reason=f"Temporary role from {interaction.user} for {duration}h")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to assign that role.", ephemeral=True)
+            return
+
+        expires_at = datetime.utcnow() + timedelta(hours=duration)
+        scheduler.cancel("remove_role", interaction.guild.id, userId=str(member.id), roleId=str(role.id))
+        await scheduler.schedule("remove_role", expires_at, interaction.guild.id, userId=str(member.id), roleId=str(role.id))
+        await interaction.response.send_message(
+            f"Gave {role.mention} to {member.mention} until {discord.utils.format_dt(expires_at.replace(tzinfo=timezone.utc), 'f')}.",
+            allowed_mentions=discord.AllowedMentions.none()
+        )
 
     # ========== /purge ==========
-    @app_commands.command(name="purge", description="Purge messages")
+    @app_commands.command(name="purge", description="Delete recent messages, optionally filtered.")
+    @app_commands.describe(
+        amount="How many matching messages to delete (up to 10,000).",
+        user="Only delete messages from this user.",
+        bots="Only delete messages from bots.",
+        contains="Only delete messages containing this text (not case-sensitive).",
+        attachments="Only delete messages with attachments.",
+        max_age="Only delete messages newer than this many minutes (up to 10 years).",
+        min_age="Only delete messages older than this many minutes (up to 10 years)."
+    )
     @app_commands.checks.has_permissions(manage_messages=True)
-    @commands.cooldown(1, 10, commands.BucketType.channel)
-    async def purge(self, interaction: discord.Interaction, amount: int):
-        await interaction.channel.purge(limit=amount)
-        await interaction.response.send_message(f"Purged {amount} messages.", ephemeral=True)
+    @app_commands.checks.cooldown(1, 10, key=lambda i: i.channel_id)
+    async def purge(
+        self,
+        interaction: discord.Interaction,
+        amount: app_commands.Range[int, 1, 10000],
+        user: Optional[discord.User] = None,
+        bots: bool = False,
+        contains: Optional[app_commands.Range[str, 1, 100]] = None,
+        attachments: bool = False,
+        max_age: Optional[app_commands.Range[int, 1, 5256000]] = None,
+        min_age: Optional[app_commands.Range[int, 1, 5256000]] = None
+    ):
+        # A plain substring rather than a regex: a moderator-supplied pattern can backtrack
+        # catastrophically, and re can't be interrupted once it's running
+        needle = contains.casefold() if contains else None
+        await interaction.response.defer(thinking=True, ephemeral=True)
+
+        def matches(message: discord.Message) -> bool:
+            if message.pinned:
+                return False
+            if user and message.author.id != user.id:
+                return False
+            if bots and not message.author.bot:
+                return False
+            if attachments and not message.attachments:
+                return False
+            if needle and needle not in message.content.casefold():
+                return False
+            return True
+
+        channel = interaction.channel
+        now = discord.utils.utcnow()
+        # Bulk delete only accepts messages younger than 14 days; leave a margin for the scan itself
+        bulk_cutoff = now - timedelta(days=14) + timedelta(minutes=5)
+        stats = {"scanned": 0, "deleted": 0}
+        batch = []
+        last_report = time.monotonic()
+
+        async def flush_batch():
+            if len(batch) == 1:
+                await batch[0].delete()
+            elif batch:
+                await channel.delete_messages(batch, reason=f"Purge by {interaction.user}")
+            stats["deleted"] += len(batch)
+            batch.clear()
+
+        try:
+            async for message in channel.history(
+                limit=self.PURGE_SCAN_LIMIT,
+                before=now - timedelta(minutes=min_age) if min_age else None,
+                after=now - timedelta(minutes=max_age) if max_age else None,
+                oldest_first=False
+            ):
+                stats["scanned"] += 1
+                if matches(message):
+                    if message.created_at > bulk_cutoff:
+                        batch.append(message)
+                        if len(batch) == self.BULK_DELETE_SIZE:
+                            await flush_batch()
+                    else:
+                        # Too old for bulk delete: one request per message, paced
+                        await flush_batch()
+                        try:
+                            await message.delete()
+                            stats["deleted"] += 1
+                        except discord.NotFound:
+                            pass
+                        await asyncio.sleep(self.OLD_DELETE_PACE)
+                    if stats["deleted"] + len(batch) >= amount:
+                        break
+
+                if time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await self.report_progress(
+                        interaction, f"⏳ Scanned {stats['scanned']:,} message(s), deleted {stats['deleted']:,}/{amount:,}…"
+                    )
+            await flush_batch()
+        except discord.Forbidden:
+            await self.report_progress(
+                interaction, f"❌ Missing permissions after deleting {stats['deleted']:,} message(s).", final=True
+            )
+            return
+
+        await self.report_progress(
+            interaction, f"Purged {stats['deleted']:,} message(s) after scanning {stats['scanned']:,}.", final=True
+        )
+        if stats["deleted"]:
+            await self.send_moderation_log(
+                interaction, f"**{interaction.user}** purged {stats['deleted']} message(s) in {channel.mention}."
+            )
+
+    @purge.error
+    async def purge_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.CommandOnCooldown):
+            await interaction.response.send_message(
+                f"❌ A purge just ran here. Try again in {error.retry_after:.0f}s.", ephemeral=True
+            )
+        else:
+            await self.moderation_error(interaction, error)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Moderation(bot))
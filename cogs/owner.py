@@ -6,6 +6,8 @@ from discord import app_commands
 import asyncio
 import os
 
+from cogs.log_delivery import deliver_log
+
 def owner_only():
     async def predicate(ctx_or_interaction):
         owner_id_str = os.getenv("OWNER_ID")
@@ -42,11 +44,11 @@ class Owner(commands.Cog):
                 log_channel = guild.get_channel(int(settings["logChannel"]))
                 if log_channel:
                     try:
-                        await log_channel.send(f"**Developer Announcement:** {update_message}")
+                        await deliver_log(self.bot, log_channel, content=f"**Developer Announcement:** {update_message}")
                         success_count += 1
                     except Exception as e:
                         if self.logger:
-                            self.logger.error(f"Failed to send update to {guild.name}: {e}")
+                            self.logger.error("Failed to send update to %s: %s", guild.name, e, extra={"cog": "Owner", "guild_id": guild.id})
                         failed_guilds.append(guild.name)
 
         response_message = (
@@ -105,6 +107,56 @@ class Owner(commands.Cog):
         else:
             await ctx.send("Remote config is not set up.")
 
+    # ========== Owner-Only Prefix Command: logdeliverystats ==========
+    @commands.command(name="logdeliverystats", help="Compare webhook vs channel log delivery throughput (Owner Only).")
+    @owner_only()
+    async def log_delivery_stats(self, ctx):
+        delivery = self.bot.get_cog("LogDelivery")
+        if delivery:
+            await ctx.send(delivery.throughput_report())
+        else:
+            await ctx.send("Log delivery is not loaded.")
+
+    # ========== Owner-Only Prefix Command: toperrors ==========
+    @commands.command(name="toperrors", help="List the most frequent error fingerprints (Owner Only).")
+    @owner_only()
+    async def top_errors(self, ctx, limit: int = 10):
+        sink = self.bot.get_cog("ErrorSink")
+        if not sink:
+            await ctx.send("Error sink is not loaded.")
+            return
+
+        entries = sink.top_errors(min(max(limit, 1), 25))
+        if not entries:
+            await ctx.send("No errors recorded.")
+            return
+
+        embed = discord.Embed(title="Top Errors", color=discord.Color.red())
+        for entry in entries:
+            embed.add_field(
+                name=f"{entry['count']}× {entry.get('type', 'Unknown')} — `{entry['fingerprint']}`",
+                value=(
+                    f"Source: {entry.get('lastSource', 'unknown')}\n"
+                    f"Last: {entry.get('lastMessage') or '[No message]'}"[:1024]
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    # ========== Owner-Only Prefix Command: rebuildwarnings ==========
+    @commands.command(name="rebuildwarnings", help="Rebuild warning counters from the moderation logs (Owner Only).")
+    @owner_only()
+    async def rebuild_warnings(self, ctx, guild_id: int = None):
+        moderation = self.bot.get_cog("Moderation")
+        if not moderation:
+            await ctx.send("Moderation is not loaded.")
+            return
+
+        async with ctx.typing():
+            written = await moderation.rebuild_warning_counts(guild_id)
+        scope = f"guild {guild_id}" if guild_id else "all guilds"
+        await ctx.send(f"Rebuilt warning counters for {scope}: {written} member(s) with warnings.")
+
     # ========== Public Slash Command: /team ==========
     @app_commands.command(name="team", description="Show the X-Ample Development team information.")
     async def team(self, interaction: discord.Interaction):
@@ -1,12 +1,20 @@
 # cogs/premium.py
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
 import time
 import re
 import os
+import bisect
+import math
+import itertools
+from collections import defaultdict
+from datetime import datetime, timezone
+from pymongo import ReturnDocument, UpdateOne, ASCENDING
+
+from cogs.error_sink import record_error, loop_error_handler
 
 
 def premium_required():
@@ -22,42 +30,278 @@ def premium_required():
     return app_commands.check(predicate)
 
 
+class XPCurve:
+    """
+    Level thresholds for a guild: thresholds[i] is the total XP needed for level i + 1, so
+    a member's level is a single bisect over the array. Linear and quadratic curves only
+    precompute the first PRECOMPUTED_LEVELS and use their closed form past that; exponential
+    curves are precomputed all the way up to XP_CAP, which they reach within a few thousand levels.
+    """
+
+    PRECOMPUTED_LEVELS = 1000
+    XP_CAP = 2 ** 62  # keeps embedded thresholds within int64 for Mongo
+    KINDS = ("linear", "quadratic", "exponential")
+
+    def __init__(self, kind: str = "linear", base: int = 100, growth: float = 1.1):
+        self.kind = kind
+        self.base = base
+        self.growth = growth
+        if kind == "exponential":
+            self.thresholds = list(itertools.takewhile(
+                lambda threshold: threshold < self.XP_CAP, map(self._threshold, itertools.count(1))
+            ))
+        else:
+            self.thresholds = [self._threshold(level) for level in range(1, self.PRECOMPUTED_LEVELS + 1)]
+
+    def _threshold(self, level: int) -> int:
+        steps = level - 1
+        if self.kind == "quadratic":
+            return self.base * steps * steps
+        if self.kind == "exponential":
+            # Each level costs `growth` times the previous one
+            try:
+                return min(int(self.base * (self.growth ** steps - 1) / (self.growth - 1)), self.XP_CAP)
+            except OverflowError:
+                return self.XP_CAP
+        return self.base * steps
+
+    def _closed_form_level(self, xp: int) -> int:
+        if self.kind == "quadratic":
+            return math.isqrt(xp // self.base) + 1
+        return xp // self.base + 1
+
+    def level_expression(self, max_xp: int, xp_field: str = "$xp") -> dict:
+        """
+        Aggregation expression computing the level for `xp_field` server-side. Only the
+        thresholds up to `max_xp` are embedded, since higher ones can't be reached; past the
+        precomputed range linear and quadratic curves use their closed form (in doubles,
+        exact below 2^53 XP).
+        """
+        if self.kind != "exponential" and max_xp >= self.thresholds[-1]:
+            steps = {"$floor": {"$divide": [xp_field, self.base]}}
+            if self.kind == "quadratic":
+                steps = {"$floor": {"$sqrt": steps}}
+            return {"$max": [1, {"$add": [steps, 1]}]}
+        reachable = self.thresholds[:bisect.bisect_right(self.thresholds, max_xp)]
+        return {"$max": [1, {"$size": {"$filter": {"input": reachable, "cond": {"$lte": ["$$this", xp_field]}}}}]}
+
+    def level_for(self, xp: int) -> int:
+        if self.kind != "exponential" and xp >= self.thresholds[-1]:
+            return self._closed_form_level(xp)
+        return max(bisect.bisect_right(self.thresholds, xp), 1)
+
+    def levels_for(self, xp_values: list) -> list:
+        """Batch lookup used by recalculation jobs."""
+        thresholds = self.thresholds
+        top = thresholds[-1] if self.kind != "exponential" else math.inf
+        return [
+            max(bisect.bisect_right(thresholds, xp), 1) if xp < top else self._closed_form_level(xp)
+            for xp in xp_values
+        ]
+
+    @classmethod
+    def from_settings(cls, config: dict) -> "XPCurve":
+        return cls(config.get("kind", "linear"), int(config.get("base", 100)), float(config.get("growth", 1.1)))
+
+    def to_settings(self) -> dict:
+        return {"kind": self.kind, "base": self.base, "growth": self.growth}
+
+
+DEFAULT_XP_CURVE = XPCurve()
+
+
+async def iter_batches(cursor, size: int):
+    """Yield lists of up to `size` docs from a pymongo cursor, fetching each batch off the event loop."""
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(cursor, size)))
+        if not batch:
+            return
+        yield batch
+
+
 class Premium(commands.Cog):
+    DEFAULT_XP_COOLDOWN = 60  # seconds between XP grants per member
+    RESYNC_CONCURRENCY = 5
+    RESYNC_PACE = 0.5  # seconds each resync worker waits between role edits
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = bot.logger
         self.levels = bot.levels  # Mongo collection for XP
+        self.xp_daily = bot.xp_daily  # Per-day XP buckets for weekly/monthly leaderboards
         self.guild_settings = bot.guild_settings
 
+        # Buffered $inc amounts for xpDaily: {(guildId, userId, day): xp}
+        self.pending_daily_xp = defaultdict(int)
+
+        # XP cooldown gate: {guild_id << 64 | user_id: monotonic time the next grant is allowed}
+        self.xp_gate = {}
+        self.xp_cooldowns = {}  # {guild_id: seconds}, only for guilds overriding the default
+        self.level_rewards = {}  # {guild_id: [(level, role_id)]} sorted by level
+        self.xp_curves = {}  # {guild_id: XPCurve}, only for guilds overriding the default
+
+    async def cog_load(self):
+        for doc in self.guild_settings.find({"xp_cooldown": {"$exists": True}}, {"guildId": 1, "xp_cooldown": 1}):
+            self.xp_cooldowns[int(doc["guildId"])] = int(doc["xp_cooldown"])
+        for doc in self.guild_settings.find({"level_rewards": {"$exists": True}}, {"guildId": 1, "level_rewards": 1}):
+            self._cache_level_rewards(int(doc["guildId"]), doc["level_rewards"])
+        for doc in self.guild_settings.find({"xp_curve": {"$exists": True}}, {"guildId": 1, "xp_curve": 1}):
+            self.xp_curves[int(doc["guildId"])] = XPCurve.from_settings(doc["xp_curve"])
+        self.evict_xp_gate.start()
+
+        self.xp_daily.create_index(
+            [("guildId", ASCENDING), ("userId", ASCENDING), ("day", ASCENDING)], unique=True
+        )
+        self.xp_daily.create_index([("guildId", ASCENDING), ("day", ASCENDING)])
+        # Buckets older than ~5 weeks are no longer needed by any window
+        self.xp_daily.create_index("day", expireAfterSeconds=35 * 24 * 3600)
+        self.flush_daily_xp.start()
+
+    async def cog_unload(self):
+        self.evict_xp_gate.cancel()
+        self.flush_daily_xp.cancel()
+        await self._flush_daily_xp()
+
+    @tasks.loop(seconds=30)
+    async def flush_daily_xp(self):
+        try:
+            await self._flush_daily_xp()
+        except Exception as e:
+            self.logger.error("Failed to flush daily XP buckets: %s", e, extra={"cog": "Premium", "event": "flush_daily_xp"})
+            record_error(self.bot, e, "task:flush_daily_xp")
+
+    flush_daily_xp.error(loop_error_handler("flush_daily_xp"))
+
+    async def _flush_daily_xp(self):
+        if not self.pending_daily_xp:
+            return
+        # Swap the buffer on the event loop, then write the batch off-loop
+        pending, self.pending_daily_xp = self.pending_daily_xp, defaultdict(int)
+        operations = [
+            UpdateOne(
+                {"guildId": guild_id, "userId": user_id, "day": day},
+                {"$inc": {"xp": amount}},
+                upsert=True
+            )
+            for (guild_id, user_id, day), amount in pending.items()
+        ]
+        try:
+            await asyncio.to_thread(self.xp_daily.bulk_write, operations, ordered=False)
+        except Exception:
+            for key, amount in pending.items():
+                self.pending_daily_xp[key] += amount
+            raise
+
+    @tasks.loop(minutes=5)
+    async def evict_xp_gate(self):
+        now = time.monotonic()
+        self.xp_gate = {key: until for key, until in self.xp_gate.items() if until > now}
+
+    evict_xp_gate.error(loop_error_handler("evict_xp_gate"))
+
+    def xp_gate_allows(self, guild_id: int, user_id: int) -> bool:
+        """True (and starts the cooldown) if the member may earn XP now."""
+        key = guild_id << 64 | user_id
+        now = time.monotonic()
+        if self.xp_gate.get(key, 0) > now:
+            return False
+        self.xp_gate[key] = now + self.xp_cooldowns.get(guild_id, self.DEFAULT_XP_COOLDOWN)
+        return True
+
+    def curve_for(self, guild_id: int) -> XPCurve:
+        return self.xp_curves.get(guild_id, DEFAULT_XP_CURVE)
+
+    def _cache_level_rewards(self, guild_id: int, rewards: list):
+        if rewards:
+            self.level_rewards[guild_id] = sorted((int(r["level"]), int(r["roleId"])) for r in rewards)
+        else:
+            self.level_rewards.pop(guild_id, None)
+
+    def reward_roles_for(self, member: discord.Member, level: int):
+        """
+        Return the member's full role list with level rewards applied (every reward up to
+        `level`, none above it), or None if nothing would change. Rewards the bot can't
+        manage are left as they are.
+        """
+        rewards = self.level_rewards.get(member.guild.id)
+        if not rewards:
+            return None
+
+        guild = member.guild
+        manageable = {}
+        for reward_level, role_id in rewards:
+            role = guild.get_role(role_id)
+            if role and not role.managed and role < guild.me.top_role:
+                manageable[role_id] = (reward_level, role)
+
+        current = {role.id for role in member.roles[1:]}
+        earned = {role_id for role_id, (reward_level, _) in manageable.items() if reward_level <= level}
+        target = (current - manageable.keys()) | earned
+        if target == current:
+            return None
+        return [role for role in member.roles[1:] if role.id in target] + [
+            manageable[role_id][1] for role_id in earned - current
+        ]
+
+    async def apply_level_rewards(self, member: discord.Member, level: int, reason: str = "Level reward"):
+        """Apply reward roles in a single member.edit call. Returns True if roles changed."""
+        roles = self.reward_roles_for(member, level)
+        if roles is None:
+            return False
+        await member.edit(roles=roles, reason=reason)
+        return True
+
+    def add_daily_xp(self, guild_id_str: str, user_id_str: str, amount: int):
+        """Buffer XP for today's bucket; flushed to xpDaily in batches."""
+        day = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.pending_daily_xp[(guild_id_str, user_id_str, day)] += amount
+
     # ----- Leveling on_message (optional if you want to keep it separate) -----
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """Example leveling logic, only for premium guilds."""
-        if message.author.bot:
+        if message.author.bot or not message.guild:
             return
 
         if message.guild.id not in self.bot.premium_guilds:
             return  # Skip if not premium
 
-        # Basic leveling:
+        if not self.xp_gate_allows(message.guild.id, message.author.id):
+            return  # Still on XP cooldown: no DB work at all
+
+        # Basic leveling: one atomic upsert; the previous doc (None if new) gives old and new XP
         guild_id_str = str(message.guild.id)
         user_id_str = str(message.author.id)
-        user_data = self.levels.find_one({"guildId": guild_id_str, "userId": user_id_str})
-        if not user_data:
-            user_data = {"guildId": guild_id_str, "userId": user_id_str, "xp": 0, "level": 1}
-            self.levels.insert_one(user_data)
+        previous = self.levels.find_one_and_update(
+            {"guildId": guild_id_str, "userId": user_id_str},
+            {"$inc": {"xp": 10}, "$setOnInsert": {"level": 1}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
 
-        xp = user_data.get("xp", 0) + 10
-        level = user_data.get("level", 1)
+        old_xp = previous.get("xp", 0) if previous else None
+        xp = (old_xp or 0) + 10
+        old_level = previous.get("level", 1) if previous else 1
+        self.add_daily_xp(guild_id_str, user_id_str, 10)
 
-        # Example threshold
-        if xp >= 100 * level:
-            level += 1
+        # Jump straight to the level the guild's curve gives for this XP
+        level = max(self.curve_for(message.guild.id).level_for(xp), old_level)
+        if level > old_level:
+            self.levels.update_one(
+                {"guildId": guild_id_str, "userId": user_id_str},
+                {"$set": {"level": level}}
+            )
             await message.channel.send(f"{message.author.mention} leveled up to Level {level}!")
-        self.levels.update_one(
-            {"guildId": guild_id_str, "userId": user_id_str},
-            {"$set": {"xp": xp, "level": level}}
-        )
+            try:
+                await self.apply_level_rewards(message.author, level)
+            except discord.HTTPException as e:
+                self.logger.warning(
+                    "Failed to apply level rewards: %s", e,
+                    extra={"cog": "Premium", "guild_id": message.guild.id, "event": "level_reward"}
+                )
+
+        # Lets other cogs (e.g. the leaderboard cache) follow XP changes without DB reads
+        self.bot.dispatch("xp_update", message.guild.id, message.author.id, old_xp, xp, level)
 
     # ----- /rank -----
     @app_commands.command(name="rank", description="Check your rank")
@@ -70,10 +314,258 @@ class Premium(commands.Cog):
         if user_data:
             xp = user_data.get("xp", 0)
             level = user_data.get("level", 1)
-            await interaction.response.send_message(f"You are Level {level} with {xp} XP.")
+            leaderboard = self.bot.get_cog("Leaderboard")
+            if leaderboard:
+                position, total = await leaderboard.rank_position(interaction.guild, xp)
+                await interaction.response.send_message(
+                    f"You are Level {level} with {xp} XP — rank #{position} of {total}."
+                )
+            else:
+                await interaction.response.send_message(f"You are Level {level} with {xp} XP.")
         else:
             await interaction.response.send_message("You don't have any levels yet!")
 
+    # ----- /setxpcooldown -----
+    @app_commands.command(name="setxpcooldown", description="Set how often members can earn XP, in seconds (Premium)")
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def setxpcooldown(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 0, 3600]):
+        self.guild_settings.update_one(
+            {"guildId": str(interaction.guild.id)},
+            {"$set": {"xp_cooldown": seconds}},
+            upsert=True
+        )
+        self.xp_cooldowns[interaction.guild.id] = seconds
+        await interaction.response.send_message(f"Members can now earn XP once every {seconds} second(s).", ephemeral=True)
+
+    # ----- Level reward roles -----
+    @app_commands.command(name="addlevelreward", description="Give a role when members reach a level (Premium)")
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def addlevelreward(self, interaction: discord.Interaction, level: app_commands.Range[int, 1, 1000], role: discord.Role):
+        guild = interaction.guild
+        if role.managed or role >= guild.me.top_role:
+            await interaction.response.send_message("I can't assign that role.", ephemeral=True)
+            return
+        # Otherwise anyone with Manage Roles could hand themselves a role above their own
+        if interaction.user.id != guild.owner_id and role >= interaction.user.top_role:
+            await interaction.response.send_message("You can only reward roles below your highest role.", ephemeral=True)
+            return
+        guild_id_str = str(guild.id)
+        self.guild_settings.update_one(
+            {"guildId": guild_id_str},
+            {"$pull": {"level_rewards": {"level": level}}},
+            upsert=True
+        )
+        settings = self.guild_settings.find_one_and_update(
+            {"guildId": guild_id_str},
+            {"$push": {"level_rewards": {"level": level, "roleId": str(role.id)}}},
+            return_document=ReturnDocument.AFTER
+        )
+        self._cache_level_rewards(interaction.guild.id, settings.get("level_rewards", []))
+        await interaction.response.send_message(f"Members reaching Level {level} will get {role.mention}.", ephemeral=True)
+
+    @app_commands.command(name="removelevelreward", description="Stop giving a role at a level (Premium)")
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def removelevelreward(self, interaction: discord.Interaction, level: int):
+        settings = self.guild_settings.find_one_and_update(
+            {"guildId": str(interaction.guild.id)},
+            {"$pull": {"level_rewards": {"level": level}}},
+            return_document=ReturnDocument.AFTER
+        )
+        self._cache_level_rewards(interaction.guild.id, (settings or {}).get("level_rewards", []))
+        await interaction.response.send_message(f"Removed the reward for Level {level}.", ephemeral=True)
+
+    @app_commands.command(name="listlevelrewards", description="List level reward roles (Premium)")
+    @premium_required()
+    async def listlevelrewards(self, interaction: discord.Interaction):
+        rewards = self.level_rewards.get(interaction.guild.id)
+        if not rewards:
+            await interaction.response.send_message("No level rewards configured.", ephemeral=True)
+            return
+        lines = [f"Level {level}: <@&{role_id}>" for level, role_id in rewards]
+        embed = discord.Embed(title="Level Rewards", description="\n".join(lines), color=discord.Color.gold())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="resynclevelrewards", description="Recompute and apply level reward roles for everyone (Premium)")
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def resynclevelrewards(self, interaction: discord.Interaction):
+        if not self.level_rewards.get(interaction.guild.id):
+            await interaction.response.send_message("No level rewards configured.", ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True)
+
+        guild = interaction.guild
+        semaphore = asyncio.Semaphore(self.RESYNC_CONCURRENCY)
+        counts = {"checked": 0, "updated": 0, "failed": 0}
+
+        async def resync_member(member: discord.Member, level: int):
+            async with semaphore:
+                try:
+                    if await self.apply_level_rewards(member, level, reason="Level reward resync"):
+                        counts["updated"] += 1
+                        await asyncio.sleep(self.RESYNC_PACE)
+                except discord.HTTPException:
+                    counts["failed"] += 1
+
+        cursor = self.levels.find({"guildId": str(guild.id)}, {"_id": 0, "userId": 1, "level": 1}, batch_size=1000)
+        async for batch in iter_batches(cursor, 1000):
+            jobs = []
+            for doc in batch:
+                member = guild.get_member(int(doc["userId"]))
+                if member:
+                    jobs.append(resync_member(member, doc.get("level", 1)))
+            counts["checked"] += len(batch)
+            await asyncio.gather(*jobs)
+            await interaction.edit_original_response(
+                content=f"Resyncing level rewards… checked {counts['checked']}, updated {counts['updated']}."
+            )
+
+        await interaction.edit_original_response(
+            content=(
+                f"Level rewards resynced: checked {counts['checked']}, "
+                f"updated {counts['updated']}, failed {counts['failed']}."
+            )
+        )
+
+    # ----- /setxpcurve -----
+    @app_commands.command(name="setxpcurve", description="Change how much XP each level needs and recalculate levels (Premium)")
+    @app_commands.describe(
+        kind="linear: base × (level - 1), quadratic: base × (level - 1)², exponential: each level costs growth × the previous",
+        base="XP needed for level 2",
+        growth="Exponential curves only: cost multiplier per level"
+    )
+    @app_commands.choices(kind=[app_commands.Choice(name=kind, value=kind) for kind in XPCurve.KINDS])
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def setxpcurve(
+        self,
+        interaction: discord.Interaction,
+        kind: app_commands.Choice[str],
+        base: app_commands.Range[int, 1, 100000] = 100,
+        growth: app_commands.Range[float, 1.01, 3.0] = 1.1
+    ):
+        curve = XPCurve(kind.value, base, growth)
+        self.guild_settings.update_one(
+            {"guildId": str(interaction.guild.id)},
+            {"$set": {"xp_curve": curve.to_settings()}},
+            upsert=True
+        )
+        self.xp_curves[interaction.guild.id] = curve
+        await interaction.response.defer(thinking=True)
+
+        checked, changed = await self.recalculate_levels(interaction.guild.id, curve)
+        await interaction.edit_original_response(
+            content=(
+                f"XP curve set to **{kind.value}** (base {base}"
+                + (f", growth {growth}" if kind.value == "exponential" else "")
+                + f"). Recalculated {checked} member(s), {changed} level(s) changed. "
+                "Run /resynclevelrewards to update reward roles."
+            )
+        )
+
+    async def recalculate_levels(self, guild_id: int, curve: XPCurve) -> tuple:
+        """
+        Recompute every member's level for `curve`: stream level docs in batches, look up
+        the levels for a whole batch at once, and bulk_write only the ones that changed.
+        """
+        checked = changed = 0
+        cursor = self.levels.find({"guildId": str(guild_id)}, {"xp": 1, "level": 1}, batch_size=5000)
+        async for batch in iter_batches(cursor, 5000):
+            new_levels = curve.levels_for([doc.get("xp", 0) for doc in batch])
+            operations = [
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"level": level}})
+                for doc, level in zip(batch, new_levels)
+                if doc.get("level", 1) != level
+            ]
+            if operations:
+                await asyncio.to_thread(self.levels.bulk_write, operations, ordered=False)
+            checked += len(batch)
+            changed += len(operations)
+
+        self.bot.dispatch("levels_recalculated", guild_id)
+        return checked, changed
+
+    # ----- /givexp -----
+    @app_commands.command(name="givexp", description="Give XP to everyone with a role (Premium)")
+    @premium_required()
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def givexp(self, interaction: discord.Interaction, role: discord.Role, amount: app_commands.Range[int, 1, 1000000]):
+        member_ids = [str(member.id) for member in role.members if not member.bot]
+        if not member_ids:
+            await interaction.response.send_message(f"No members have {role.mention}.", ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True)
+
+        guild = interaction.guild
+        guild_id_str = str(guild.id)
+        curve = self.curve_for(guild.id)
+        before = {
+            doc["userId"]: doc
+            for doc in await asyncio.to_thread(lambda: list(self.levels.find(
+                {"guildId": guild_id_str, "userId": {"$in": member_ids}},
+                {"_id": 0, "userId": 1, "xp": 1, "level": 1}
+            )))
+        }
+
+        # Existing members: one update_many whose pipeline adds XP and recomputes the level server-side
+        if before:
+            max_xp = max(doc.get("xp", 0) for doc in before.values()) + amount
+            await asyncio.to_thread(
+                self.levels.update_many,
+                {"guildId": guild_id_str, "userId": {"$in": list(before)}},
+                [
+                    {"$set": {"xp": {"$add": [{"$ifNull": ["$xp", 0]}, amount]}}},
+                    {"$set": {"level": {"$max": [{"$ifNull": ["$level", 1]}, curve.level_expression(max_xp)]}}},
+                ]
+            )
+        # Members without a level doc yet
+        new_ids = [user_id for user_id in member_ids if user_id not in before]
+        if new_ids:
+            await asyncio.to_thread(
+                self.levels.insert_many,
+                [{"guildId": guild_id_str, "userId": user_id, "xp": amount, "level": curve.level_for(amount)} for user_id in new_ids],
+                ordered=False
+            )
+
+        # Mirror the server-side result locally for notifications, rewards and caches
+        leveled_up = []
+        for user_id in member_ids:
+            doc = before.get(user_id)
+            old_xp = doc.get("xp", 0) if doc else None
+            old_level = doc.get("level", 1) if doc else 1
+            xp = (old_xp or 0) + amount
+            level = max(old_level, curve.level_for(xp))
+            self.bot.dispatch("xp_update", guild.id, int(user_id), old_xp, xp, level)
+            if level > old_level:
+                leveled_up.append((int(user_id), level))
+
+        semaphore = asyncio.Semaphore(self.RESYNC_CONCURRENCY)
+
+        async def reward(member: discord.Member, level: int):
+            async with semaphore:
+                try:
+                    if await self.apply_level_rewards(member, level, reason="Level reward (/givexp)"):
+                        await asyncio.sleep(self.RESYNC_PACE)
+                except discord.HTTPException:
+                    pass
+
+        await asyncio.gather(*(
+            reward(member, level) for user_id, level in leveled_up if (member := guild.get_member(user_id))
+        ))
+
+        await interaction.edit_original_response(
+            content=f"Gave {amount} XP to {len(member_ids)} member(s) with {role.mention}."
+        )
+        if leveled_up:
+            lines = [f"<@{user_id}> → Level {level}" for user_id, level in leveled_up]
+            summary = f"🎉 {len(leveled_up)} member(s) leveled up:\n" + "\n".join(lines)
+            if len(summary) > 2000:
+                summary = summary[:1950].rsplit("\n", 1)[0] + "\n…and more"
+            await interaction.followup.send(summary, allowed_mentions=discord.AllowedMentions.none())
+
     # ----- /remindme -----
     @app_commands.command(name="remindme", description="Set a reminder (Premium Only)")
     @premium_required()
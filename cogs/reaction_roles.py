@@ -1,18 +1,351 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Optional, Union
+import asyncio
+from collections import Counter
+from pymongo import ASCENDING, DeleteMany, UpdateOne
+
+
+def emoji_key(emoji: Union[str, discord.PartialEmoji, discord.Emoji]) -> str:
+    """
+    Normalize an emoji to the key used by the in-memory index: the ID for custom emoji
+    (so renames don't break links), the emoji itself for unicode.
+    """
+    if isinstance(emoji, str):
+        emoji = discord.PartialEmoji.from_str(emoji.strip())
+    return str(emoji.id) if emoji.id else emoji.name
+
 
 class ReactionRoles(commands.Cog):
     """
     Simple Reaction Role system using slash commands and raw reaction events.
+    All links are held in memory so reactions on untracked messages cost a dict miss.
     """
 
+    RECONCILE_CONCURRENCY = 3  # messages reconciled at once
+    RECONCILE_PACE = 0.5  # seconds between role edits per worker
+    ROLE_EDIT_WINDOW = 1.5  # seconds reaction changes are coalesced per member
+    CLEANUP_PACE = 1.0  # seconds between background reaction removals
+    GROUP_MODES = ("normal", "exclusive", "limit", "verify")
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db = bot.db  # Reference your MongoDB or other database
         # We'll store records in a collection named 'reactionRoles'
         self.reaction_col = self.db.reactionRoles
+        # Checkpoints for the startup reconciliation job
+        self.sync_col = self.db.reactionRoleSync
+        # Per-message group settings (exclusive / limit-N / verify-only panels)
+        self.group_col = self.db.reactionRoleGroups
+        # Who we've seen react with each linked emoji, so reconciliation can tell a reaction
+        # removed while we were offline from a role that was given some other way
+        self.reactor_col = self.db.reactionRoleReactors
+        # {message_id: {emoji_key: (role_id, action, emoji)}}
+        self.reaction_index = {}
+        self.message_modes = {}  # {message_id: (mode, limit)}, only for non-normal panels
+        self.reaction_cleanup = asyncio.Queue()  # (channel_id, message_id, emoji, member_id)
+        self._cleanup_task = None
+        self.message_channels = {}  # {message_id: (guild_id, channel_id)}
+        self._reconcile_task = None
+        # Coalesced role changes: {(guild_id, member_id): {"add": set, "remove": set}}
+        self.pending_role_edits = {}
+        self._role_edit_tasks = set()  # strong refs so pending flushes aren't garbage collected
+
+    async def cog_load(self):
+        self.reactor_col.create_index(
+            [("messageId", ASCENDING), ("emojiKey", ASCENDING), ("userId", ASCENDING)], unique=True
+        )
+        for doc in self.reaction_col.find(
+            {},
+            {"guildId": 1, "channelId": 1, "messageId": 1, "emoji": 1, "emojiKey": 1, "roleId": 1, "action": 1}
+        ):
+            self._index_add(doc)
+        for doc in self.group_col.find({}, {"messageId": 1, "mode": 1, "limit": 1}):
+            self.message_modes[int(doc["messageId"])] = (doc["mode"], doc.get("limit", 1))
+        self._cleanup_task = asyncio.create_task(self._reaction_cleanup_worker())
+
+    async def cog_unload(self):
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+        for guild_id, member_id in list(self.pending_role_edits):
+            await self.flush_role_edit(guild_id, member_id)
+
+    def _index_add(self, doc: dict):
+        self.message_channels[int(doc["messageId"])] = (int(doc["guildId"]), int(doc["channelId"]))
+        key = doc.get("emojiKey") or emoji_key(doc["emoji"])
+        self.reaction_index.setdefault(int(doc["messageId"]), {})[key] = (
+            int(doc["roleId"]),
+            doc.get("action", "toggle"),
+            doc["emoji"]
+        )
+
+    def _index_remove(self, message_id: int, key: str):
+        links = self.reaction_index.get(message_id)
+        if links is None:
+            return
+        links.pop(key, None)
+        if not links:
+            del self.reaction_index[message_id]
+            self.message_channels.pop(message_id, None)
+
+    # ------------------------------------------
+    # Debounced role edits
+    # ------------------------------------------
+    def queue_role_change(self, member: discord.Member, add: tuple = (), remove: tuple = ()):
+        """
+        Record role changes for a member and apply them all in one member.edit after
+        ROLE_EDIT_WINDOW seconds. The latest change for a role wins, and if the final set
+        equals the member's current roles nothing is sent at all.
+        """
+        key = (member.guild.id, member.id)
+        pending = self.pending_role_edits.get(key)
+        if pending is None:
+            pending = self.pending_role_edits[key] = {"add": set(), "remove": set()}
+            task = asyncio.create_task(self._flush_role_edit_later(*key))
+            self._role_edit_tasks.add(task)
+            task.add_done_callback(self._role_edit_tasks.discard)
+        for role_id in add:
+            pending["remove"].discard(role_id)
+            pending["add"].add(role_id)
+        for role_id in remove:
+            pending["add"].discard(role_id)
+            pending["remove"].add(role_id)
+
+    async def _flush_role_edit_later(self, guild_id: int, member_id: int):
+        await asyncio.sleep(self.ROLE_EDIT_WINDOW)
+        await self.flush_role_edit(guild_id, member_id)
+
+    async def flush_role_edit(self, guild_id: int, member_id: int):
+        pending = self.pending_role_edits.pop((guild_id, member_id), None)
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(member_id) if guild else None
+        if not pending or member is None:
+            return
+
+        current = member.roles[1:]
+        current_ids = {role.id for role in current}
+        roles = [role for role in current if role.id not in pending["remove"]]
+        roles += [
+            role for role_id in pending["add"] - current_ids
+            if (role := guild.get_role(role_id)) is not None
+        ]
+        if {role.id for role in roles} == current_ids:
+            return  # Changes cancelled out
+
+        try:
+            await member.edit(roles=roles, reason="Reaction roles updated.")
+        except discord.HTTPException as e:
+            # e.g. the bot doesn't have permission to assign one of those roles
+            self.bot.logger.warning(
+                "Reaction role edit failed: %s", e,
+                extra={"cog": "ReactionRoles", "guild_id": guild_id, "event": "role_edit"}
+            )
+
+    def _effective_role_ids(self, member: discord.Member) -> set:
+        """The member's roles once their queued changes are applied."""
+        role_ids = {role.id for role in member.roles}
+        pending = self.pending_role_edits.get((member.guild.id, member.id))
+        if pending:
+            role_ids = (role_ids - pending["remove"]) | pending["add"]
+        return role_ids
+
+    # ------------------------------------------
+    # Background reaction cleanup
+    # ------------------------------------------
+    def queue_reaction_removal(self, channel_id: int, message_id: int, emoji: str, member_id: int):
+        self.reaction_cleanup.put_nowait((channel_id, message_id, emoji, member_id))
+
+    async def _reaction_cleanup_worker(self):
+        """Remove stale reactions one at a time, well behind role edits and commands."""
+        while True:
+            channel_id, message_id, emoji, member_id = await self.reaction_cleanup.get()
+            channel = self.bot.get_channel(channel_id)
+            if channel is not None:
+                try:
+                    await channel.get_partial_message(message_id).remove_reaction(emoji, discord.Object(id=member_id))
+                except discord.HTTPException:
+                    pass
+            await asyncio.sleep(self.CLEANUP_PACE)
+
+    # ------------------------------------------
+    # Startup reconciliation
+    # ------------------------------------------
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after a full reconnect; never run two jobs at once
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self.reconcile_all())
+
+    async def reconcile_all(self):
+        """
+        Bring roles in line with the reactions on every tracked message, fixing anything
+        missed while the bot was offline. Finished messages are checkpointed so a restart
+        resumes the same run instead of starting over.
+        """
+        checkpoint = self.sync_col.find_one({"_id": "reconcile"})
+        if checkpoint and not checkpoint.get("finished"):
+            done = set(checkpoint.get("done", []))
+        else:
+            done = set()
+            self.sync_col.replace_one(
+                {"_id": "reconcile"},
+                {"startedAt": datetime.now(timezone.utc), "finished": False, "done": []},
+                upsert=True
+            )
+
+        semaphore = asyncio.Semaphore(self.RECONCILE_CONCURRENCY)
+        counts = {"added": 0, "removed": 0, "failed": 0}
+        # How many messages link each role; a role linked from several can't be removed from one alone
+        role_messages = Counter(
+            role_id for links in self.reaction_index.values() for role_id in {link[0] for link in links.values()}
+        )
+
+        async def run(message_id: int):
+            async with semaphore:
+                try:
+                    await self.reconcile_message(message_id, counts, role_messages)
+                except discord.HTTPException as e:
+                    self.bot.logger.warning(
+                        "Reaction role reconciliation failed for message %s: %s", message_id, e,
+                        extra={"cog": "ReactionRoles", "event": "reconcile"}
+                    )
+                    return
+                self.sync_col.update_one({"_id": "reconcile"}, {"$addToSet": {"done": str(message_id)}})
+
+        pending = [message_id for message_id in list(self.reaction_index) if str(message_id) not in done]
+        await asyncio.gather(*(run(message_id) for message_id in pending))
+        self.sync_col.update_one(
+            {"_id": "reconcile"},
+            {"$set": {"finished": True, "finishedAt": datetime.now(timezone.utc)}}
+        )
+        self.bot.logger.info(
+            "Reaction role reconciliation finished: %s message(s), %s added, %s removed, %s failed",
+            len(pending), counts["added"], counts["removed"], counts["failed"],
+            extra={"cog": "ReactionRoles", "event": "reconcile"}
+        )
+
+    async def reconcile_message(self, message_id: int, counts: dict, role_messages: Counter):
+        links = self.reaction_index.get(message_id)
+        guild_id, channel_id = self.message_channels.get(message_id, (None, None))
+        guild = self.bot.get_guild(guild_id) if guild_id else None
+        channel = guild.get_channel(channel_id) if guild else None
+        if not links or channel is None:
+            return
+
+        try:
+            message = await channel.fetch_message(message_id)
+        except discord.NotFound:
+            return
+
+        reactions = {emoji_key(reaction.emoji): reaction for reaction in message.reactions}
+        mode, limit = self.message_modes.get(message_id, ("normal", 0))
+
+        # Reactors recorded by the reaction events (or the last run) before we went offline
+        recorded_docs = await asyncio.to_thread(
+            lambda: list(self.reactor_col.find({"messageId": str(message_id)}, {"_id": 0, "emojiKey": 1, "userId": 1}))
+        )
+        recorded_by_key = {}  # {emoji_key: {user_id}}
+        for doc in recorded_docs:
+            recorded_by_key.setdefault(doc["emojiKey"], set()).add(int(doc["userId"]))
+
+        # Reactors per role across every emoji on this message that grants it
+        reacted = {}  # {role_id: {user_id}}
+        recorded = {}  # {role_id: {user_id}}
+        reactors_by_key = {}  # {emoji_key: {user_id}}
+        removable = {}  # {role_id: bool}, True only if every link for the role is a toggle
+        for key, (role_id, action, _) in links.items():
+            users = reacted.setdefault(role_id, set())
+            recorded.setdefault(role_id, set()).update(recorded_by_key.get(key, ()))
+            removable[role_id] = removable.get(role_id, True) and action == "toggle"
+            key_users = reactors_by_key[key] = set()
+            if key in reactions:
+                # Stream reactors page by page (the iterator fetches 100 at a time)
+                async for user in reactions[key].users(limit=None):
+                    if not user.bot:
+                        key_users.add(user.id)
+            users |= key_users
+
+        # Only toggle links take the role away when the reaction is gone (never for verify
+        # panels), and only when no other message links the role: a reaction there may be
+        # why the member holds it
+        strippable = {
+            role_id for role_id in reacted
+            if removable[role_id] and mode != "verify" and role_messages[role_id] <= 1
+        }
+        # Only members we saw react and whose reaction is now gone lose the role; anyone else
+        # holding it got it some other way (a panel, /temprole, a level reward, a moderator)
+        departed = {role_id: recorded[role_id] - reacted[role_id] for role_id in strippable}
+
+        grants = reacted
+        if mode in ("exclusive", "limit"):
+            # Reaction order isn't available after the fact, so keep the roles members already
+            # hold and grant the rest in panel order up to the cap; extra reactions are taken back
+            cap = 1 if mode == "exclusive" else limit
+            panel_emojis = {role_id: emoji for role_id, _, emoji in links.values()}
+            grants = {role_id: set(users) for role_id, users in reacted.items()}
+            for user_id in set().union(*reacted.values()):
+                member = guild.get_member(user_id)
+                if member is None:
+                    continue
+                held = {
+                    role_id for role_id in self._effective_role_ids(member) & panel_emojis.keys()
+                    if user_id not in departed.get(role_id, ())
+                }
+                wanted = [role_id for role_id in panel_emojis if role_id not in held and user_id in reacted[role_id]]
+                for role_id in wanted[max(cap - len(held), 0):]:
+                    grants[role_id].discard(user_id)
+                    self.queue_reaction_removal(channel.id, message_id, panel_emojis[role_id], user_id)
+
+        for role_id in reacted:
+            role = guild.get_role(role_id)
+            if role is None:
+                continue
+
+            holders = {member.id for member in role.members}
+            to_add = [guild.get_member(user_id) for user_id in grants[role_id] - holders]
+            to_remove = [guild.get_member(user_id) for user_id in holders & departed.get(role_id, set())]
+
+            for member in to_add:
+                if member:
+                    await self._reconcile_edit(member.add_roles(role, reason="Reaction role reconciliation"), counts, "added")
+            for member in to_remove:
+                if member and not member.bot:
+                    await self._reconcile_edit(member.remove_roles(role, reason="Reaction role reconciliation"), counts, "removed")
+
+        await asyncio.to_thread(self._save_reactors, guild.id, message_id, recorded_by_key, reactors_by_key)
+
+    def _save_reactors(self, guild_id: int, message_id: int, recorded_by_key: dict, reactors_by_key: dict):
+        """Bring the stored reactor snapshot for a message in line with what we just fetched."""
+        operations = []
+        for key, users in reactors_by_key.items():
+            before = recorded_by_key.get(key, set())
+            gone = before - users
+            if gone:
+                operations.append(DeleteMany({
+                    "messageId": str(message_id), "emojiKey": key, "userId": {"$in": [str(user_id) for user_id in gone]}
+                }))
+            operations += [
+                UpdateOne(
+                    {"messageId": str(message_id), "emojiKey": key, "userId": str(user_id)},
+                    {"$setOnInsert": {"guildId": str(guild_id)}},
+                    upsert=True
+                )
+                for user_id in users - before
+            ]
+        if operations:
+            self.reactor_col.bulk_write(operations, ordered=False)
+
+    async def _reconcile_edit(self, edit, counts: dict, outcome: str):
+        try:
+            await edit
+            counts[outcome] += 1
+        except discord.HTTPException:
+            counts["failed"] += 1
+        await asyncio.sleep(self.RECONCILE_PACE)
 
     # ------------------------------------------
     # Slash Command Group: /reactionrole ...
@@ -49,10 +382,12 @@ class ReactionRoles(commands.Cog):
             "channelId": str(channel.id),
             "messageId": str(message_id),
             "emoji": emoji,
+            "emojiKey": emoji_key(emoji),
             "roleId": str(role.id),
             "action": "toggle"  # or something else if you want different logic
         }
         self.reaction_col.insert_one(doc)
+        self._index_add(doc)
 
         # 3) Optionally add the reaction to the message
         try:
@@ -79,13 +414,17 @@ class ReactionRoles(commands.Cog):
         /removereactionrole <message_id> :emoji:
         Removes any DB record linking this emoji to a role for that message.
         """
+        key = emoji_key(emoji)
         result = self.reaction_col.delete_one({
             "guildId": str(interaction.guild_id),
             "messageId": message_id,
-            "emoji": emoji
+            "$or": [{"emojiKey": key}, {"emoji": emoji}]
         })
 
         if result.deleted_count > 0:
+            if message_id.isdigit():
+                self._index_remove(int(message_id), key)
+            self.reactor_col.delete_many({"messageId": message_id, "emojiKey": key})
             await interaction.response.send_message(
                 f"Removed reaction role for emoji {emoji} on message `{message_id}`.",
                 ephemeral=True
@@ -121,6 +460,44 @@ class ReactionRoles(commands.Cog):
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="reactionrolemode", description="Make a reaction-role message exclusive, limited or verify-only.")
+    @app_commands.describe(
+        mode="normal: any number of roles, exclusive: pick one, limit: pick up to N, verify: roles can't be removed by unreacting",
+        limit="How many roles members may pick in limit mode."
+    )
+    @app_commands.choices(mode=[app_commands.Choice(name=m, value=m) for m in GROUP_MODES])
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def reaction_role_mode(
+        self,
+        interaction: discord.Interaction,
+        message_id: str,
+        mode: app_commands.Choice[str],
+        limit: Optional[app_commands.Range[int, 1, 25]] = 1
+    ):
+        """
+        /reactionrolemode <message_id> <mode> [limit]
+        """
+        if not message_id.isdigit() or int(message_id) not in self.reaction_index:
+            await interaction.response.send_message(f"No reaction roles found on message `{message_id}`.", ephemeral=True)
+            return
+
+        if mode.value == "normal":
+            self.group_col.delete_one({"messageId": message_id})
+            self.message_modes.pop(int(message_id), None)
+        else:
+            self.group_col.update_one(
+                {"messageId": message_id},
+                {"$set": {"guildId": str(interaction.guild_id), "mode": mode.value, "limit": limit}},
+                upsert=True
+            )
+            self.message_modes[int(message_id)] = (mode.value, limit)
+
+        detail = f" (up to {limit})" if mode.value == "limit" else ""
+        await interaction.response.send_message(
+            f"Reaction roles on message `{message_id}` are now **{mode.value}**{detail}.",
+            ephemeral=True
+        )
+
     # ------------------------------------------
     # Events: on_raw_reaction_add / remove
     # ------------------------------------------
@@ -128,56 +505,79 @@ class ReactionRoles(commands.Cog):
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """
         Triggered whenever a reaction is added to a message, including older messages.
-        We'll check if it's one of our stored reaction roles, then assign the role.
+        We'll check if it's one of our stored reaction roles, then assign the role,
+        honouring the message's group mode.
         """
-        # 1) Ignore bots
-        if payload.member is None or payload.member.bot:
+        # 1) Check the in-memory index first: almost every reaction is untracked
+        links = self.reaction_index.get(payload.message_id)
+        if links is None:
             return
-
-        # 2) Check DB for a matching record
-        doc = self.reaction_col.find_one({
-            "guildId": str(payload.guild_id),
-            "channelId": str(payload.channel_id),
-            "messageId": str(payload.message_id),
-            "emoji": str(payload.emoji)  # using the exact string of the emoji
-        })
-
-        if not doc:
+        link = links.get(emoji_key(payload.emoji))
+        if link is None:
             return  # Not a reaction role we're tracking
+        role_id, _, _ = link
+
+        # 2) Ignore bots
+        if payload.member is None or payload.member.bot:
+            return
+        self.reactor_col.update_one(
+            {"messageId": str(payload.message_id), "emojiKey": emoji_key(payload.emoji), "userId": str(payload.user_id)},
+            {"$setOnInsert": {"guildId": str(payload.guild_id)}},
+            upsert=True
+        )
 
         # 3) Assign the role
         guild = self.bot.get_guild(payload.guild_id)
         if guild is None:
             return
 
-        role = guild.get_role(int(doc["roleId"]))
-        if role is None:
+        if guild.get_role(role_id) is None:
             return
 
-        try:
-            await payload.member.add_roles(role, reason="Reaction role added.")
-        except discord.Forbidden:
-            # The bot doesn't have permission to assign that role
-            pass
+        mode, limit = self.message_modes.get(payload.message_id, ("normal", 0))
+        member = payload.member
+        panel_roles = {rid: emoji for rid, _, emoji in links.values()}
+        held = self._effective_role_ids(member) & panel_roles.keys()
+
+        if mode == "exclusive":
+            # Swap to the new role in the same edit, then tidy the old reactions up later
+            others = held - {role_id}
+            self.queue_role_change(member, add=(role_id,), remove=tuple(others))
+            for other in others:
+                self.queue_reaction_removal(payload.channel_id, payload.message_id, panel_roles[other], member.id)
+            return
+
+        if mode == "limit" and role_id not in held and len(held) >= limit:
+            # Over the limit: refuse the role and take the reaction back
+            self.queue_reaction_removal(payload.channel_id, payload.message_id, str(payload.emoji), member.id)
+            return
+
+        self.queue_role_change(member, add=(role_id,))
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
         """
-        Triggered whenever a reaction is removed. We'll remove the role if 'action' is toggle.
+        Triggered whenever a reaction is removed. We'll remove the role if 'action' is toggle
+        and the message isn't a verify-only panel.
         """
-        # If we only want the role removed if 'action' is toggle or certain logic, we can do that check
-        doc = self.reaction_col.find_one({
-            "guildId": str(payload.guild_id),
-            "channelId": str(payload.channel_id),
-            "messageId": str(payload.message_id),
-            "emoji": str(payload.emoji)
-        })
-        if not doc:
+        links = self.reaction_index.get(payload.message_id)
+        if links is None:
+            return
+        link = links.get(emoji_key(payload.emoji))
+        if link is None:
             return
+        role_id, action, _ = link
+        self.reactor_col.delete_one(
+            {"messageId": str(payload.message_id), "emojiKey": emoji_key(payload.emoji), "userId": str(payload.user_id)}
+        )
 
-        if doc.get("action") != "toggle":
+        if action != "toggle":
             return  # Maybe we don't remove roles for other action types
 
+        mode, _ = self.message_modes.get(payload.message_id, ("normal", 0))
+        if mode == "verify":
+            return  # Verification roles stay once granted
+
         guild = self.bot.get_guild(payload.guild_id)
         if guild is None:
             return
@@ -186,14 +586,10 @@ class ReactionRoles(commands.Cog):
         if not member or member.bot:
             return
 
-        role = guild.get_role(int(doc["roleId"]))
-        if not role:
+        if not guild.get_role(role_id):
             return
 
-        try:
-            await member.remove_roles(role, reason="Reaction role removed.")
-        except discord.Forbidden:
-            pass
+        self.queue_role_change(member, remove=(role_id,))
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ReactionRoles(bot))
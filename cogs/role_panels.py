@@ -0,0 +1,154 @@
+# cogs/role_panels.py
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+from typing import Optional
+import re
+
+CUSTOM_ID_PREFIX = "rolepanel"
+
+
+class RolePanels(commands.Cog):
+    """
+    Button/select-menu role panels. Everything needed to handle a click is in the component
+    itself: buttons carry their role ID in `custom_id` and select options carry role IDs as
+    values, so clicks are handled without any DB read and keep working across restarts.
+    """
+
+    MAX_ROLES = 25
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = bot.logger
+
+    @app_commands.command(name="rolepanel", description="Post a panel of buttons or a select menu for self-assignable roles.")
+    @app_commands.describe(
+        roles="Mention the roles to offer, separated by spaces or commas (up to 25).",
+        style="Buttons toggle one role each; a select menu sets the chosen roles at once.",
+        title="Text shown above the panel."
+    )
+    @app_commands.choices(style=[
+        app_commands.Choice(name="buttons", value="buttons"),
+        app_commands.Choice(name="select", value="select"),
+    ])
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def rolepanel(
+        self,
+        interaction: discord.Interaction,
+        roles: str,
+        style: app_commands.Choice[str],
+        title: Optional[str] = "Pick your roles"
+    ):
+        guild = interaction.guild
+        is_owner = interaction.user.id == guild.owner_id
+        role_objs = []
+        for mention_id, plain_id in re.findall(r"<@&(\d+)>|\b(\d{17,19})\b", roles):
+            role = guild.get_role(int(mention_id or plain_id))
+            if role and role not in role_objs and not role.managed and role < guild.me.top_role \
+                    and (is_owner or role < interaction.user.top_role):
+                role_objs.append(role)
+        if not role_objs:
+            await interaction.response.send_message(
+                "No assignable roles found. Mention roles that are below both my highest role and yours.",
+                ephemeral=True
+            )
+            return
+        role_objs = role_objs[:self.MAX_ROLES]
+
+        view = discord.ui.View(timeout=None)
+        if style.value == "buttons":
+            for role in role_objs:
+                view.add_item(discord.ui.Button(
+                    label=role.name[:80],
+                    style=discord.ButtonStyle.secondary,
+                    custom_id=f"{CUSTOM_ID_PREFIX}:button:{role.id}"
+                ))
+        else:
+            view.add_item(discord.ui.Select(
+                custom_id=f"{CUSTOM_ID_PREFIX}:select",
+                placeholder="Choose your roles",
+                min_values=0,
+                max_values=len(role_objs),
+                options=[discord.SelectOption(label=role.name[:100], value=str(role.id)) for role in role_objs]
+            ))
+
+        try:
+            # The title is free text from a member with Manage Roles; it must not ping anyone
+            await interaction.channel.send(content=title, view=view, allowed_mentions=discord.AllowedMentions.none())
+        except discord.HTTPException:
+            await interaction.response.send_message("I can't post messages in this channel.", ephemeral=True)
+            return
+        # Clicks are handled by on_interaction below, so the view doesn't need to stay registered
+        view.stop()
+        await interaction.response.send_message("Role panel posted.", ephemeral=True)
+
+    # ------------------------------------------
+    # Component handling (stateless)
+    # ------------------------------------------
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        if interaction.type != discord.InteractionType.component or not interaction.guild:
+            return
+        custom_id = (interaction.data or {}).get("custom_id", "")
+        if not custom_id.startswith(f"{CUSTOM_ID_PREFIX}:"):
+            return
+
+        member = interaction.user
+        current = member.roles[1:]
+        current_ids = {role.id for role in current}
+        parts = custom_id.split(":")
+
+        if parts[1] == "button" and len(parts) == 3 and parts[2].isdigit():
+            role_id = int(parts[2])
+            panel_ids = {role_id}
+            wanted_ids = set() if role_id in current_ids else {role_id}
+        elif parts[1] == "select":
+            panel_ids = self._select_option_ids(interaction.message, custom_id)
+            wanted_ids = {int(value) for value in interaction.data.get("values", []) if value.isdigit()} & panel_ids
+        else:
+            return
+
+        await self.apply_panel_roles(interaction, member, current, current_ids, panel_ids, wanted_ids)
+
+    def _select_option_ids(self, message: discord.Message, custom_id: str) -> set:
+        """The role IDs a select menu offers, read from the message's own components."""
+        for row in message.components if message else []:
+            for component in getattr(row, "children", []):
+                if getattr(component, "custom_id", None) == custom_id:
+                    return {int(option.value) for option in component.options if option.value.isdigit()}
+        return set()
+
+    async def apply_panel_roles(
+        self,
+        interaction: discord.Interaction,
+        member: discord.Member,
+        current: list,
+        current_ids: set,
+        panel_ids: set,
+        wanted_ids: set
+    ):
+        guild = interaction.guild
+        assignable = {
+            role_id: role for role_id in panel_ids
+            if (role := guild.get_role(role_id)) and not role.managed and role < guild.me.top_role
+        }
+        added = [assignable[role_id] for role_id in wanted_ids - current_ids if role_id in assignable]
+        removed = [role for role in current if role.id in assignable and role.id not in wanted_ids]
+
+        if not added and not removed:
+            await interaction.response.send_message("Your roles are already up to date.", ephemeral=True)
+            return
+
+        roles = [role for role in current if role not in removed] + added
+        try:
+            await member.edit(roles=roles, reason="Role panel")
+        except discord.Forbidden:
+            await interaction.response.send_message("I don't have permission to change those roles.", ephemeral=True)
+            return
+
+        lines = [f"Added {role.mention}" for role in added] + [f"Removed {role.mention}" for role in removed]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RolePanels(bot))
@@ -0,0 +1,222 @@
+# cogs/scheduler.py
+
+import discord
+from discord.ext import commands
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+import asyncio
+import heapq
+
+from cogs.error_sink import record_error
+
+
+class ScheduleWindow:
+    """
+    The in-memory part of a persisted schedule: a heap of the earliest-due actions plus the
+    (due_at, action_id) key up to which it is known to hold everything in the store. Anything
+    later stays in the store until the heap runs low and is refilled in due-time order.
+    """
+
+    def __init__(self, size: int = 500):
+        self.size = size
+        self.heap = []  # [(due_at, action_id, doc)]
+        self.loaded_until = None  # key of the last action fetched from the store
+        self.exhausted = False  # True once the store had nothing past loaded_until
+
+    def covers(self, key: tuple) -> bool:
+        return self.exhausted or (self.loaded_until is not None and key <= self.loaded_until)
+
+    def add(self, due_at, action_id, doc):
+        """Track a newly stored action if it falls inside the loaded window."""
+        if not self.covers((due_at, action_id)):
+            return
+        heapq.heappush(self.heap, (due_at, action_id, doc))
+        if len(self.heap) > 2 * self.size:
+            # A sorted list is a valid heap; the dropped tail is still in the store
+            self.heap = heapq.nsmallest(self.size, self.heap)
+            self.loaded_until = self.heap[-1][:2]
+            self.exhausted = False
+
+    def refill_limit(self) -> int:
+        """How many actions to fetch from the store, or 0 if no refill is needed."""
+        if self.exhausted or len(self.heap) > self.size // 4:
+            return 0
+        return self.size - len(self.heap)
+
+    def extend(self, rows: list, limit: int):
+        """Add a batch fetched (in key order) after loaded_until."""
+        for row in rows:
+            heapq.heappush(self.heap, row)
+        if rows:
+            self.loaded_until = rows[-1][:2]
+        self.exhausted = len(rows) < limit
+
+    def next_due(self):
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now) -> list:
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap)[2])
+        return due
+
+
+class Scheduler(commands.Cog):
+    """
+    Persistent scheduler for timed actions (temp-bans, timed role removals, lockdowns, ...).
+    Actions live in the scheduledActions collection; only the next WINDOW_SIZE are held in
+    memory, and a single sleeper task waits for the earliest one.
+
+    Cogs register a coroutine per action type with `register(action, handler)`; handlers are
+    called as `handler(guild, payload)`.
+    """
+
+    WINDOW_SIZE = 500
+    MAX_SLEEP = 300  # seconds; re-check at least this often
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = timedelta(minutes=10)
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = bot.logger
+        self.scheduled_actions = bot.scheduled_actions
+        self.handlers = {}  # {action: coroutine function(guild, payload)}
+        self.window = ScheduleWindow(self.WINDOW_SIZE)
+        self._lock = asyncio.Lock()  # keeps inserts and refills from interleaving
+        self._wake = asyncio.Event()
+        self._sleeper = None
+
+    async def cog_load(self):
+        self.scheduled_actions.create_index([("dueAt", ASCENDING), ("_id", ASCENDING)])
+        self.scheduled_actions.create_index([("action", ASCENDING), ("guildId", ASCENDING)])
+        self._sleeper = asyncio.create_task(self._run())
+
+    async def cog_unload(self):
+        if self._sleeper:
+            self._sleeper.cancel()
+
+    def register(self, action: str, handler):
+        self.handlers[action] = handler
+
+    # ================================================================
+    #                   Public API
+    # ================================================================
+    async def schedule(self, action: str, due_at: datetime, guild_id: int, **payload):
+        """Persist an action to run at `due_at` (naive UTC) and return its ID."""
+        return await self._insert({"action": action, "dueAt": due_at, "guildId": str(guild_id), "payload": payload, "attempts": 0})
+
+    async def _insert(self, doc: dict):
+        async with self._lock:
+            self.scheduled_actions.insert_one(doc)
+            self.window.add(doc["dueAt"], doc["_id"], doc)
+        self._wake.set()
+        return doc["_id"]
+
+    def cancel(self, action: str, guild_id: int, **payload) -> int:
+        """
+        Cancel pending actions matching the payload fields. Copies still in the heap are
+        skipped when they come due, because executing an action first claims it in the store.
+        """
+        query = {"action": action, "guildId": str(guild_id)}
+        query.update({f"payload.{key}": value for key, value in payload.items()})
+        return self.scheduled_actions.delete_many(query).deleted_count
+
+    # ================================================================
+    #                   Sleeper
+    # ================================================================
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                self._wake.clear()
+                await self._refill()
+                now = datetime.utcnow()
+                due_at = self.window.next_due()
+                if due_at is None or due_at > now:
+                    delay = self.MAX_SLEEP if due_at is None else min((due_at - now).total_seconds(), self.MAX_SLEEP)
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await asyncio.gather(*(self._execute(doc) for doc in self.window.pop_due(now)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(
+                    "Scheduler loop failed: %s", e,
+                    extra={"cog": "Scheduler", "event": "sleeper"}
+                )
+                record_error(self.bot, e, "task:scheduler")
+                await asyncio.sleep(5)
+
+    async def _refill(self):
+        async with self._lock:
+            limit = self.window.refill_limit()
+            if not limit:
+                return
+            query = {}
+            if self.window.loaded_until:
+                due_at, action_id = self.window.loaded_until
+                query = {"$or": [{"dueAt": {"$gt": due_at}}, {"dueAt": due_at, "_id": {"$gt": action_id}}]}
+            docs = await asyncio.to_thread(
+                lambda: list(self.scheduled_actions.find(query).sort([("dueAt", ASCENDING), ("_id", ASCENDING)]).limit(limit))
+            )
+            self.window.extend([(doc["dueAt"], doc["_id"], doc) for doc in docs], limit)
+
+    async def _execute(self, doc: dict):
+        handler = self.handlers.get(doc["action"])
+        if handler is None:
+            # Owning cog isn't loaded; leave it in the store for the next start
+            self.logger.warning(
+                "No handler for scheduled action %s (%s)", doc["action"], doc["_id"],
+                extra={"cog": "Scheduler", "event": "execute"}
+            )
+            return
+
+        guild = self.bot.get_guild(int(doc["guildId"]))
+        if guild is None or guild.unavailable:
+            # An outage (unavailable) doesn't count as an attempt; a missing guild usually means
+            # we were removed, so that one gives up after MAX_ATTEMPTS
+            await self._postpone(doc, count_attempt=guild is None)
+            return
+
+        # Claim the action; if it's gone it was cancelled (or already run)
+        if self.scheduled_actions.delete_one({"_id": doc["_id"]}).deleted_count == 0:
+            return
+
+        try:
+            await handler(guild, doc["payload"])
+        except Exception as e:
+            self.logger.error(
+                "Scheduled action %s failed in %s: %s", doc["action"], guild.id, e,
+                extra={"cog": "Scheduler", "guild_id": guild.id, "event": "execute"}
+            )
+            record_error(self.bot, e, f"scheduler:{doc['action']}")
+            attempts = doc.get("attempts", 0) + 1
+            if attempts < self.MAX_ATTEMPTS:
+                retry = {key: value for key, value in doc.items() if key != "_id"}
+                await self._insert({**retry, "dueAt": datetime.utcnow() + self.RETRY_DELAY, "attempts": attempts})
+
+    async def _postpone(self, doc: dict, count_attempt: bool):
+        """Push an unclaimed action back by RETRY_DELAY, or drop it once it's out of attempts."""
+        attempts = doc.get("attempts", 0) + (1 if count_attempt else 0)
+        if attempts >= self.MAX_ATTEMPTS:
+            self.scheduled_actions.delete_one({"_id": doc["_id"]})
+            self.logger.warning(
+                "Dropping scheduled action %s for missing guild %s", doc["action"], doc["guildId"],
+                extra={"cog": "Scheduler", "event": "execute"}
+            )
+            return
+        due_at = datetime.utcnow() + self.RETRY_DELAY
+        async with self._lock:
+            result = self.scheduled_actions.update_one(
+                {"_id": doc["_id"]}, {"$set": {"dueAt": due_at, "attempts": attempts}}
+            )
+            if result.matched_count:  # Not cancelled in the meantime
+                doc.update(dueAt=due_at, attempts=attempts)
+                self.window.add(due_at, doc["_id"], doc)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Scheduler(bot))
@@ -6,6 +6,8 @@ from datetime import datetime, timezone
 import aiohttp
 import os
 
+from cogs.error_sink import record_error, loop_error_handler
+
 class BotTasks(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -50,7 +52,10 @@ class BotTasks(commands.Cog):
                         if not edited:
                             await stats_channel.send(embed=embed)
         except Exception as e:
-            self.logger.error(f"Error updating server stats: {e}")
+            self.logger.error("Error updating server stats: %s", e, extra={"cog": "BotTasks", "event": "update_server_stats"})
+            record_error(self.bot, e, "task:update_server_stats")
+
+    update_server_stats.error(loop_error_handler("update_server_stats"))
 
     @tasks.loop(minutes=10)
     async def refresh_premium_guilds(self):
@@ -73,11 +78,23 @@ class BotTasks(commands.Cog):
                         dev_log_channel = self.bot.get_channel(dev_log_channel_id)
                         if dev_log_channel:
                             await dev_log_channel.send(f"Premium guilds updated: {self.bot.premium_guilds}")
-                        self.logger.info(f"Premium guilds updated: {self.bot.premium_guilds}")
+                        self.logger.info(
+                            "Premium guilds updated: %s", self.bot.premium_guilds,
+                            extra={"cog": "BotTasks", "event": "refresh_premium_guilds"}
+                        )
                     else:
-                        self.logger.error(f"Failed to fetch entitlements. HTTP Status: {response.status}")
+                        self.logger.error(
+                            "Failed to fetch entitlements. HTTP Status: %s", response.status,
+                            extra={"cog": "BotTasks", "event": "refresh_premium_guilds"}
+                        )
             except Exception as e:
-                self.logger.error(f"Exception while refreshing premium guilds: {e}")
+                self.logger.error(
+                    "Exception while refreshing premium guilds: %s", e,
+                    extra={"cog": "BotTasks", "event": "refresh_premium_guilds"}
+                )
+                record_error(self.bot, e, "task:refresh_premium_guilds")
+
+    refresh_premium_guilds.error(loop_error_handler("refresh_premium_guilds"))
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(BotTasks(bot))
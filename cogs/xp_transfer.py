@@ -0,0 +1,192 @@
+# cogs/xp_transfer.py
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+from pymongo import UpdateOne
+import aiohttp
+import asyncio
+import csv
+import gzip
+import io
+import itertools
+import json
+import tempfile
+import time
+
+from cogs.premium import premium_required, iter_batches, DEFAULT_XP_CURVE
+
+USER_ID_FIELDS = ("userId", "user_id", "id")
+XP_FIELDS = ("xp", "XP", "experience")
+MAX_XP = 2 ** 63 - 1  # Mongo's int64 limit
+
+
+def parse_import_rows(text: io.TextIOBase, fmt: str):
+    """
+    Lazily parse an uploaded file into (user_id_str, xp) tuples.
+    Rows that can't be understood are yielded as None so they can be counted.
+    """
+    rows = csv.DictReader(text) if fmt == "csv" else (json.loads(line) for line in text if line.strip())
+    for row in rows:
+        if not isinstance(row, dict):
+            yield None
+            continue
+        user_id = next((str(row[f]).strip() for f in USER_ID_FIELDS if row.get(f) not in (None, "")), None)
+        xp = next((row[f] for f in XP_FIELDS if row.get(f) not in (None, "")), None)
+        try:
+            xp = int(float(xp))
+        except (TypeError, ValueError, OverflowError):
+            yield None
+            continue
+        if not user_id or not user_id.isdigit() or not 0 <= xp <= MAX_XP:
+            yield None
+            continue
+        yield user_id, xp
+
+
+class XPTransfer(commands.Cog):
+    """
+    Streaming export/import of a guild's levels, for backups and migrations from other
+    leveling bots. Neither direction holds the whole guild in memory: export streams the
+    cursor into a gzip temp file, import streams the upload to disk and parses it in batches.
+    """
+
+    BATCH_SIZE = 5000
+    PROGRESS_INTERVAL = 3  # seconds between progress edits
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = bot.logger
+        self.levels = bot.levels
+
+    def curve_for(self, guild_id: int):
+        premium = self.bot.get_cog("Premium")
+        return premium.curve_for(guild_id) if premium else DEFAULT_XP_CURVE
+
+    # ----- /exportxp -----
+    @app_commands.command(name="exportxp", description="Download this server's XP data as a compressed file (Premium)")
+    @app_commands.choices(fmt=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="NDJSON", value="ndjson"),
+    ])
+    @app_commands.rename(fmt="format")
+    @premium_required()
+    @app_commands.checks.has_permissions(administrator=True)
+    async def exportxp(self, interaction: discord.Interaction, fmt: app_commands.Choice[str]):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        guild = interaction.guild
+        started = last_report = time.monotonic()
+        rows = 0
+
+        with tempfile.TemporaryFile() as raw:
+            # Closing the text wrapper closes the gzip stream but not the temp file
+            text = io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode="wb"), encoding="utf-8", newline="")
+            writer = csv.writer(text)
+            if fmt.value == "csv":
+                writer.writerow(["userId", "xp", "level"])
+
+            cursor = self.levels.find(
+                {"guildId": str(guild.id)},
+                {"_id": 0, "userId": 1, "xp": 1, "level": 1},
+                batch_size=self.BATCH_SIZE
+            )
+            async for batch in iter_batches(cursor, self.BATCH_SIZE):
+                await asyncio.to_thread(self._write_rows, text, writer, fmt.value, batch)
+                rows += len(batch)
+                if time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await interaction.edit_original_response(content=self._progress("Exported", rows, started))
+
+            await asyncio.to_thread(text.close)
+            size = raw.tell()
+            if size > guild.filesize_limit:
+                await interaction.edit_original_response(
+                    content=f"The export is {size / 1_000_000:.1f} MB, over this server's upload limit."
+                )
+                return
+
+            raw.seek(0)
+            file = discord.File(raw, filename=f"xp-{guild.id}.{fmt.value}.gz")
+            await interaction.edit_original_response(
+                content=self._progress("Exported", rows, started) + f" ({size / 1_000_000:.1f} MB)",
+                attachments=[file]
+            )
+
+    def _write_rows(self, text: io.TextIOWrapper, writer, fmt: str, batch: list):
+        for doc in batch:
+            if fmt == "csv":
+                writer.writerow([doc["userId"], doc.get("xp", 0), doc.get("level", 1)])
+            else:
+                text.write(json.dumps({"userId": doc["userId"], "xp": doc.get("xp", 0), "level": doc.get("level", 1)}))
+                text.write("\n")
+
+    # ----- /importxp -----
+    @app_commands.command(name="importxp", description="Import XP from a CSV/NDJSON file, optionally gzipped (Premium)")
+    @app_commands.describe(file="Rows with userId and xp columns/keys. Existing XP for those members is replaced.")
+    @premium_required()
+    @app_commands.checks.has_permissions(administrator=True)
+    async def importxp(self, interaction: discord.Interaction, file: discord.Attachment):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        guild_id_str = str(interaction.guild.id)
+        curve = self.curve_for(interaction.guild.id)
+        name = file.filename.lower().removesuffix(".gz")
+        fmt = "ndjson" if name.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+        started = last_report = time.monotonic()
+        imported = skipped = 0
+
+        with tempfile.TemporaryFile() as raw:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(file.url) as response:
+                    if response.status != 200:
+                        await interaction.edit_original_response(content=f"Couldn't download the file (HTTP {response.status}).")
+                        return
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        raw.write(chunk)
+
+            raw.seek(0)
+            is_gzip = raw.read(2) == b"\x1f\x8b"
+            raw.seek(0)
+            stream = gzip.GzipFile(fileobj=raw, mode="rb") if is_gzip else raw
+            text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+            rows = parse_import_rows(text, fmt)
+
+            try:
+                while True:
+                    batch = await asyncio.to_thread(lambda: list(itertools.islice(rows, self.BATCH_SIZE)))
+                    if not batch:
+                        break
+                    operations = []
+                    for row in batch:
+                        if row is None:
+                            skipped += 1
+                            continue
+                        user_id, xp = row
+                        operations.append(UpdateOne(
+                            {"guildId": guild_id_str, "userId": user_id},
+                            {"$set": {"xp": xp, "level": curve.level_for(xp)}},
+                            upsert=True
+                        ))
+                    if operations:
+                        await asyncio.to_thread(self.levels.bulk_write, operations, ordered=False)
+                        imported += len(operations)
+                    if time.monotonic() - last_report >= self.PROGRESS_INTERVAL:
+                        last_report = time.monotonic()
+                        await interaction.edit_original_response(content=self._progress("Imported", imported, started))
+            except (UnicodeDecodeError, csv.Error, json.JSONDecodeError, OSError, OverflowError) as e:
+                await interaction.edit_original_response(
+                    content=f"Import stopped after {imported} row(s): the file couldn't be read ({e})."
+                )
+                self.bot.dispatch("levels_recalculated", interaction.guild.id)
+                return
+
+        self.bot.dispatch("levels_recalculated", interaction.guild.id)
+        await interaction.edit_original_response(
+            content=self._progress("Imported", imported, started) + f", skipped {skipped} invalid row(s)."
+        )
+
+    def _progress(self, verb: str, rows: int, started: float) -> str:
+        elapsed = max(time.monotonic() - started, 0.001)
+        return f"{verb} {rows:,} row(s) in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)"
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(XPTransfer(bot))
@@ -5,14 +5,135 @@ from discord.ext import commands
 from dotenv import load_dotenv
 from pymongo import MongoClient
 import os
+import copy
+import json
+import time
+import queue
+import random
 import logging
+import logging.handlers
 import asyncio
 
 # =============== LOAD ENVIRONMENT VARIABLES ===============
 load_dotenv()
 
 # =============== LOGGING SETUP ===============
-logging.basicConfig(level=logging.INFO)
+# Records are pushed onto a queue from the event loop and written to
+# stdout (and optionally LOG_FILE) by a QueueListener thread, so slow
+# disks or terminals never stall the bot.
+STRUCTURED_FIELDS = ("guild_id", "cog", "event", "latency_ms")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single JSON line, including structured extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler.prepare() formats the record and folds the traceback into the message
+    before queueing it. Keep the message and traceback apart so JsonFormatter can emit
+    the traceback as its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # exc_info holds a traceback with frame references; don't keep it alive in the queue
+        record.exc_info = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops noisy records. Records are grouped by logger and message template
+    (so use %-style args, not f-strings), and each group may emit `burst`
+    records per `interval` seconds. A record can also carry `sample_rate`
+    (0.0 - 1.0) in its extras to be sampled instead.
+    Warnings and above are never dropped.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows = {}  # {(logger, template): [window_start, count, suppressed]}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        sample_rate = getattr(record, "sample_rate", None)
+        if sample_rate is not None and random.random() >= sample_rate:
+            return False
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        return False
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(
+        burst=int(os.getenv("LOG_RATE_BURST", 20)),
+        interval=float(os.getenv("LOG_RATE_INTERVAL", 60)),
+    ))
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler()]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(log_file, maxBytes=10_000_000, backupCount=5))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO"))
+
+    return logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+
+log_listener = setup_logging()
 logger = logging.getLogger("my_bot")
 
 # =============== MONGODB SETUP ===============
@@ -23,7 +144,11 @@ db = client.get_database(os.getenv("MONGODB_DB_NAME"))
 # MongoDB collections for use in cogs
 guild_settings = db.guildSettings
 moderation_logs = db.moderationLogs
+infraction_counts = db.infractionCounts
+mutes = db.mutes
+scheduled_actions = db.scheduledActions
 levels = db.levels
+xp_daily = db.xpDaily
 error_logs = db.errorLogs
 remote_config = db.remoteConfig
 
@@ -40,7 +165,11 @@ bot.db = db
 bot.logger = logger
 bot.guild_settings = guild_settings
 bot.moderation_logs = moderation_logs
+bot.infraction_counts = infraction_counts
+bot.mutes = mutes
+bot.scheduled_actions = scheduled_actions
 bot.levels = levels
+bot.xp_daily = xp_daily
 bot.error_logs = error_logs
 bot.remote_config = remote_config
 
@@ -54,12 +183,12 @@ OWNER_ID = int(os.getenv("OWNER_ID", 0))
 
 @bot.event
 async def on_ready():
-    logger.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    logger.info("Logged in as %s (ID: %s)", bot.user, bot.user.id, extra={"event": "ready"})
     try:
         await tree.sync()
         logger.info("Slash commands synced!")
     except Exception as e:
-        logger.error(f"Error syncing slash commands: {e}")
+        logger.error("Error syncing slash commands: %s", e, extra={"event": "ready"})
 
     # Additional startup logic can be added here
     # (e.g., starting background tasks, checking DB connections, etc.)
@@ -69,6 +198,17 @@ async def on_interaction(interaction: discord.Interaction):
     """Logs every slash command interaction to the dev log channel."""
     try:
         if interaction.type == discord.InteractionType.application_command:
+            latency_ms = (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000
+            logger.info(
+                "Slash command %s executed",
+                interaction.command.name if interaction.command else "Unknown",
+                extra={
+                    "event": "app_command",
+                    "guild_id": interaction.guild_id,
+                    "latency_ms": round(latency_ms, 2),
+                },
+            )
+
             dev_guild = bot.get_guild(DEV_GUILD_ID)
             if not dev_guild:
                 return
@@ -92,10 +232,11 @@ async def on_interaction(interaction: discord.Interaction):
             )
             await dev_log_channel.send(embed=embed)
     except Exception as e:
-        logger.error(f"Failed to log slash command interaction: {e}")
+        logger.error("Failed to log slash command interaction: %s", e, extra={"event": "app_command"})
 
 # =============== LOAD COGS ===============
 INITIAL_EXTENSIONS = [
+    "cogs.scheduler",
     "cogs.automod",
     "cogs.moderation",
     "cogs.premium",
@@ -107,17 +248,28 @@ INITIAL_EXTENSIONS = [
     "cogs.logging_enhancements",
     "cogs.telephone",
     "cogs.reaction_roles",
-    "cogs.afk_and_lockdown"
+    "cogs.afk_and_lockdown",
+    "cogs.log_delivery",
+    "cogs.error_sink",
+    "cogs.xp_transfer",
+    "cogs.role_panels"
 ]
 
 async def main():
+    log_listener.start()
+    try:
+        await run_bot()
+    finally:
+        log_listener.stop()
+
+async def run_bot():
     # Load each extension with error handling
     for ext in INITIAL_EXTENSIONS:
         try:
             await bot.load_extension(ext)
-            logger.info(f"Loaded extension: {ext}")
+            logger.info("Loaded extension: %s", ext)
         except Exception as e:
-            logger.error(f"Failed to load extension {ext}: {e}")
+            logger.error("Failed to load extension %s: %s", ext, e)
 
     # Ensure the DISCORD_TOKEN is set
     token = os.getenv("DISCORD_TOKEN")